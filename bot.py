@@ -23,9 +23,21 @@ import os
 import re
 import sqlite3
 import logging
+import threading
+import time
 import requests
+import heapq
 import io
+import itertools
+import json
+import math
+import orjson
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
+from functools import lru_cache, wraps
 from bs4 import BeautifulSoup, Comment
 from urllib.parse import quote
 from slack_bolt import App
@@ -52,14 +64,113 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Shared HTTP session (reuses TCP/TLS connections across API calls); the
+# pool is sized for the worker threads that can be fetching at once
+_session = requests.Session()
+_session.mount("https://", HTTPAdapter(pool_connections=8, pool_maxsize=16))
+_session.mount("http://", HTTPAdapter(pool_connections=8, pool_maxsize=16))
+
+# Worker pool for fanning out independent API calls
+_io_pool = ThreadPoolExecutor(max_workers=8)
+
+# Upstream response lifetimes in seconds (overridable from the environment).
+# Lines move slower than live scores, so odds are kept a little longer; injury
+# reports change rarely.
+ODDS_CACHE_TTL = int(os.environ.get("ODDS_CACHE_TTL", "30"))
+SCORES_CACHE_TTL = int(os.environ.get("SCORES_CACHE_TTL", "15"))
+KALSHI_CACHE_TTL = int(os.environ.get("KALSHI_CACHE_TTL", "30"))
+INJURIES_CACHE_TTL = int(os.environ.get("INJURIES_CACHE_TTL", "300"))
+
+
+def ttl_cache(seconds, maxsize=32):
+    """Memoize a fetcher's results per arguments for `seconds`.
+
+    None (the fetchers' error value) is never cached. Past maxsize entries the
+    oldest is dropped.
+    """
+
+    def decorator(func):
+        cache = {}  # (args, kwargs) -> (fetched_at, value)
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            key = (args, tuple(sorted(kwargs.items())))
+            cached = cache.get(key)
+            if cached and time.monotonic() - cached[0] < seconds:
+                return cached[1]
+
+            value = func(*args, **kwargs)
+            if value is not None:
+                cache.pop(key, None)
+                if len(cache) >= maxsize:
+                    cache.pop(next(iter(cache)), None)
+                cache[key] = (time.monotonic(), value)
+            return value
+
+        wrapper.cache = cache
+        return wrapper
+
+    return decorator
+
+
 # Database
 DATABASE = "/data/bets.db" if os.path.isdir("/data") else "bets.db"
 
+# Shared connection (opened once, reused by every helper)
+_db_conn = None
+_db_lock = threading.Lock()
+
+
+def get_db():
+    """Get or open the shared database connection."""
+    global _db_conn
+    if _db_conn is None:
+        # Autocommit mode: each statement commits on its own under WAL
+        conn = sqlite3.connect(
+            DATABASE, check_same_thread=False, isolation_level=None
+        )
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA cache_size=-64000")
+        conn.execute("PRAGMA mmap_size=268435456")
+        conn.execute("PRAGMA busy_timeout=5000")
+        _db_conn = conn
+    return _db_conn
+
+
+@contextmanager
+def transaction():
+    """Batch writes into one BEGIN IMMEDIATE ... COMMIT on the shared connection."""
+    with _db_lock:
+        conn = get_db()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+            conn.execute("COMMIT")
+        except:
+            conn.execute("ROLLBACK")
+            raise
+
+
+# Settled-bet aggregates, rebuilt lazily and dropped whenever a bet resolves
+_balances_cache = None
+_records_cache = None
+_history_cache = {}  # (user_id, limit) -> settled bets, newest first
+
+
+def invalidate_settled_cache():
+    """Drop cached balances/records/histories. Call with _db_lock held."""
+    global _balances_cache, _records_cache
+    _balances_cache = None
+    _records_cache = None
+    _history_cache.clear()
+
 
 def init_db():
     """Initialize the database."""
-    conn = sqlite3.connect(DATABASE)
-    c = conn.cursor()
+    c = get_db().cursor()
     c.execute("""
         CREATE TABLE IF NOT EXISTS bets (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -69,6 +180,7 @@ def init_db():
             person2_id TEXT,
             person2_name TEXT,
             amount TEXT,
+            amount_cents INTEGER,
             description TEXT,
             status TEXT DEFAULT 'open',
             winner_id TEXT,
@@ -109,8 +221,95 @@ def init_db():
             updated_at TEXT
         )
     """)
-    conn.commit()
-    conn.close()
+
+    # Last uploaded DARKO projections, so they survive a restart
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS darko_projections (
+            name_lower TEXT PRIMARY KEY,
+            name TEXT,
+            team TEXT,
+            minutes REAL,
+            pts REAL,
+            ast REAL,
+            reb REAL,
+            stl REAL,
+            blk REAL,
+            updated_at TEXT
+        )
+    """)
+
+    # Migrate older databases: add amount_cents and backfill it from amount
+    columns = [row["name"] for row in c.execute("PRAGMA table_info(bets)")]
+    if "amount_cents" not in columns:
+        c.execute("ALTER TABLE bets ADD COLUMN amount_cents INTEGER")
+    c.execute("""
+        UPDATE bets SET amount_cents = CAST(ROUND(
+            CAST(REPLACE(REPLACE(amount, '$', ''), ',', '') AS REAL) * 100
+        ) AS INTEGER)
+        WHERE amount_cents IS NULL
+    """)
+
+    # Indexes for the open/history listings and per-user lookups
+    indexes_before = _index_names(c)
+    c.execute("""
+        CREATE INDEX IF NOT EXISTS idx_bets_open
+        ON bets(channel_id, created_at DESC) WHERE status = 'open'
+    """)
+    c.execute("""
+        CREATE INDEX IF NOT EXISTS idx_bets_resolved
+        ON bets(resolved_at DESC) WHERE status != 'open'
+    """)
+    c.execute("""
+        CREATE INDEX IF NOT EXISTS idx_bets_resolved_channel
+        ON bets(channel_id, resolved_at DESC) WHERE status != 'open'
+    """)
+    # (person, status) so per-user lookups seek straight to open/settled bets;
+    # these replace the older person-only indexes
+    c.execute("DROP INDEX IF EXISTS idx_bets_person1")
+    c.execute("DROP INDEX IF EXISTS idx_bets_person2")
+    c.execute("""
+        CREATE INDEX IF NOT EXISTS idx_bets_person1_status
+        ON bets(person1_id, status)
+    """)
+    c.execute("""
+        CREATE INDEX IF NOT EXISTS idx_bets_person2_status
+        ON bets(person2_id, status)
+    """)
+    c.execute("""
+        CREATE INDEX IF NOT EXISTS idx_parlays_user_status_created
+        ON parlays(user_id, status, created_at DESC)
+    """)
+
+    # Gather planner statistics when an index above is new, so it gets picked;
+    # running ANALYZE on every start would get slower as the tables grow
+    if not _index_names(c) <= indexes_before:
+        c.execute("ANALYZE")
+
+
+def _index_names(cursor):
+    """Names of the database's indexes."""
+    cursor.execute("SELECT name FROM sqlite_master WHERE type = 'index'")
+    return {row[0] for row in cursor.fetchall()}
+
+
+# Largest bet amount accepted, in cents ($1,000,000)
+MAX_BET_CENTS = 100_000_000
+
+
+def parse_amount_cents(amount):
+    """Parse a "$1,234.50" style amount into integer cents (0 if unparseable).
+
+    Returns None for amounts too large to store (over MAX_BET_CENTS).
+    """
+    try:
+        cents = round(float(str(amount).replace("$", "").replace(",", "")) * 100)
+    except ValueError:
+        return 0
+    except OverflowError:
+        return None
+    if cents > MAX_BET_CENTS:
+        return None
+    return cents
 
 
 def add_bet(
@@ -124,296 +323,249 @@ def add_bet(
     created_by,
 ):
     """Add a new bet to the database."""
-    conn = sqlite3.connect(DATABASE)
-    c = conn.cursor()
-    c.execute(
-        """
-        INSERT INTO bets (channel_id, person1_id, person1_name, person2_id,
-                         person2_name, amount, description, status, created_at, created_by)
-        VALUES (?, ?, ?, ?, ?, ?, ?, 'open', ?, ?)
-    """,
-        (
-            channel_id,
-            person1_id,
-            person1_name,
-            person2_id,
-            person2_name,
-            amount,
-            description,
-            datetime.now().isoformat(),
-            created_by,
-        ),
-    )
-    bet_id = c.lastrowid
-    conn.commit()
-    conn.close()
-    return bet_id
+    with _db_lock:
+        row = get_db().execute(
+            """
+            INSERT INTO bets (channel_id, person1_id, person1_name, person2_id,
+                             person2_name, amount, amount_cents, description, status,
+                             created_at, created_by)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, 'open', ?, ?)
+            RETURNING id
+        """,
+            (
+                channel_id,
+                person1_id,
+                person1_name,
+                person2_id,
+                person2_name,
+                amount,
+                parse_amount_cents(amount),
+                description,
+                datetime.now().isoformat(),
+                created_by,
+            ),
+        ).fetchone()
+    return row[0]
+
+
+# Bet listing queries. Fixed statement texts let the connection's statement
+# cache prepare each one once per process.
+_SQL_OPEN_ALL = "SELECT * FROM bets WHERE status = 'open' ORDER BY created_at DESC"
+_SQL_OPEN_CHANNEL = """
+    SELECT * FROM bets WHERE status = 'open' AND channel_id = ?
+    ORDER BY created_at DESC
+"""
+_SQL_OPEN_FOR_USER = """
+    SELECT * FROM bets WHERE person1_id = :user_id AND status = 'open'
+    UNION ALL
+    SELECT * FROM bets WHERE person2_id = :user_id AND status = 'open'
+        AND person1_id != :user_id
+    ORDER BY created_at DESC
+"""
+_SQL_RESOLVED_ALL = """
+    SELECT * FROM bets WHERE status != 'open' ORDER BY resolved_at DESC LIMIT ?
+"""
+_SQL_RESOLVED_CHANNEL = """
+    SELECT * FROM bets WHERE status != 'open' AND channel_id = ?
+    ORDER BY resolved_at DESC LIMIT ?
+"""
 
 
 def get_open_bets(channel_id=None):
     """Get all open bets, optionally filtered by channel."""
-    conn = sqlite3.connect(DATABASE)
-    conn.row_factory = sqlite3.Row
-    c = conn.cursor()
-    if channel_id:
-        c.execute(
-            "SELECT * FROM bets WHERE status = 'open' AND channel_id = ? ORDER BY created_at DESC",
-            (channel_id,),
-        )
-    else:
-        c.execute("SELECT * FROM bets WHERE status = 'open' ORDER BY created_at DESC")
-    rows = c.fetchall()
-    conn.close()
-    return [dict(row) for row in rows]
+    with _db_lock:
+        if channel_id:
+            return get_db().execute(_SQL_OPEN_CHANNEL, (channel_id,)).fetchall()
+        return get_db().execute(_SQL_OPEN_ALL).fetchall()
+
+
+def get_open_bets_for_user(user_id):
+    """Get open bets (any channel) that a user is part of."""
+    with _db_lock:
+        return get_db().execute(_SQL_OPEN_FOR_USER, {"user_id": user_id}).fetchall()
 
 
 def get_resolved_bets(channel_id=None, limit=10):
     """Get resolved bets."""
-    conn = sqlite3.connect(DATABASE)
-    conn.row_factory = sqlite3.Row
-    c = conn.cursor()
-    if channel_id:
-        c.execute(
-            """SELECT * FROM bets WHERE status != 'open' AND channel_id = ?
-                    ORDER BY resolved_at DESC LIMIT ?""",
-            (channel_id, limit),
-        )
-    else:
-        c.execute(
-            "SELECT * FROM bets WHERE status != 'open' ORDER BY resolved_at DESC LIMIT ?",
-            (limit,),
-        )
-    rows = c.fetchall()
-    conn.close()
-    return [dict(row) for row in rows]
+    with _db_lock:
+        if channel_id:
+            params = (channel_id, limit)
+            return get_db().execute(_SQL_RESOLVED_CHANNEL, params).fetchall()
+        return get_db().execute(_SQL_RESOLVED_ALL, (limit,)).fetchall()
 
 
 def settle_bet(bet_id, winner_id, winner_name):
     """Settle a bet with a winner."""
-    conn = sqlite3.connect(DATABASE)
-    c = conn.cursor()
-    c.execute(
-        """
-        UPDATE bets SET status = 'settled', winner_id = ?, resolved_at = ?
-        WHERE id = ? AND status = 'open'
-    """,
-        (winner_id, datetime.now().isoformat(), bet_id),
-    )
-    updated = c.rowcount
-    conn.commit()
-    conn.close()
+    with _db_lock:
+        c = get_db().cursor()
+        c.execute(
+            """
+            UPDATE bets SET status = 'settled', winner_id = ?, resolved_at = ?
+            WHERE id = ? AND status = 'open'
+        """,
+            (winner_id, datetime.now().isoformat(), bet_id),
+        )
+        updated = c.rowcount
+        if updated:
+            invalidate_settled_cache()
     return updated > 0
 
 
 def cancel_bet(bet_id):
     """Cancel a bet."""
-    conn = sqlite3.connect(DATABASE)
-    c = conn.cursor()
-    c.execute(
-        """
-        UPDATE bets SET status = 'cancelled', resolved_at = ?
-        WHERE id = ? AND status = 'open'
-    """,
-        (datetime.now().isoformat(), bet_id),
-    )
-    updated = c.rowcount
-    conn.commit()
-    conn.close()
+    with _db_lock:
+        c = get_db().cursor()
+        c.execute(
+            """
+            UPDATE bets SET status = 'cancelled', resolved_at = ?
+            WHERE id = ? AND status = 'open'
+        """,
+            (datetime.now().isoformat(), bet_id),
+        )
+        updated = c.rowcount
+        if updated:
+            invalidate_settled_cache()
     return updated > 0
 
 
 def get_bet(bet_id):
     """Get a specific bet by ID."""
-    conn = sqlite3.connect(DATABASE)
-    conn.row_factory = sqlite3.Row
-    c = conn.cursor()
-    c.execute("SELECT * FROM bets WHERE id = ?", (bet_id,))
-    row = c.fetchone()
-    conn.close()
-    return dict(row) if row else None
+    with _db_lock:
+        return get_db().execute("SELECT * FROM bets WHERE id = ?", (bet_id,)).fetchone()
+
+
+# One row per participant of every settled bet: the winner gets +amount_cents
+# and won = 1, the loser gets -amount_cents and won = 0.
+_SETTLED_PARTICIPANTS_SQL = """
+    SELECT winner_id AS user_id,
+           CASE WHEN winner_id = person1_id THEN person1_name ELSE person2_name END AS name,
+           amount_cents AS delta,
+           1 AS won
+    FROM bets WHERE status = 'settled'
+    UNION ALL
+    SELECT CASE WHEN winner_id = person2_id THEN person1_id ELSE person2_id END,
+           CASE WHEN winner_id = person1_id THEN person2_name ELSE person1_name END,
+           -amount_cents,
+           0
+    FROM bets WHERE status = 'settled'
+"""
 
 
 def get_balances():
-    """Calculate balances for all users from settled bets."""
-    conn = sqlite3.connect(DATABASE)
-    conn.row_factory = sqlite3.Row
-    c = conn.cursor()
-    c.execute("SELECT * FROM bets WHERE status = 'settled'")
-    rows = c.fetchall()
-    conn.close()
-
-    balances = {}  # user_id -> {'name': name, 'balance': amount}
-
-    for bet in rows:
-        bet = dict(bet)
-        winner_id = bet["winner_id"]
-        loser_id = (
-            bet["person1_id"] if winner_id == bet["person2_id"] else bet["person2_id"]
-        )
-        winner_name = (
-            bet["person1_name"]
-            if winner_id == bet["person1_id"]
-            else bet["person2_name"]
-        )
-        loser_name = (
-            bet["person2_name"]
-            if winner_id == bet["person1_id"]
-            else bet["person1_name"]
+    """Calculate balances for all users from settled bets (cached)."""
+    global _balances_cache
+    with _db_lock:
+        if _balances_cache is not None:
+            return _balances_cache
+        # Plain tuples: these rows are unpacked straight into the cache
+        c = get_db().cursor()
+        c.row_factory = None
+        c.execute(
+            f"""SELECT user_id, name, SUM(delta) / 100.0 AS balance
+                FROM ({_SETTLED_PARTICIPANTS_SQL}) GROUP BY user_id"""
         )
 
-        # Parse amount (remove $ and convert to float)
-        amount_str = bet["amount"].replace("$", "").replace(",", "")
-        try:
-            amount = float(amount_str)
-        except:
-            amount = 0
-
-        # Update winner balance
-        if winner_id not in balances:
-            balances[winner_id] = {"name": winner_name, "balance": 0}
-        balances[winner_id]["balance"] += amount
-
-        # Update loser balance
-        if loser_id not in balances:
-            balances[loser_id] = {"name": loser_name, "balance": 0}
-        balances[loser_id]["balance"] -= amount
-
-    return balances
-
-
-def get_user_balance(user_id):
-    """Get balance for a specific user."""
-    balances = get_balances()
-    return balances.get(user_id, {"name": "Unknown", "balance": 0})
+        # user_id -> {'name': name, 'balance': amount}
+        _balances_cache = {
+            user_id: {"name": name, "balance": balance}
+            for user_id, name, balance in c.fetchall()
+        }
+        return _balances_cache
 
 
 def get_user_debts(user_id):
-    """Get who this user owes and who owes them."""
-    conn = sqlite3.connect(DATABASE)
-    conn.row_factory = sqlite3.Row
-    c = conn.cursor()
-    c.execute(
-        """SELECT * FROM bets WHERE status = 'settled'
-                 AND (person1_id = ? OR person2_id = ?)""",
-        (user_id, user_id),
-    )
-    rows = c.fetchall()
-    conn.close()
-
-    # Track net debt between this user and each other user
-    debts = {}  # other_user_id -> {'name': name, 'amount': net_amount}
-    # positive = they owe you, negative = you owe them
-
-    for bet in rows:
-        bet = dict(bet)
-        winner_id = bet["winner_id"]
-
-        # Determine the other person in this bet
-        if bet["person1_id"] == user_id:
-            other_id = bet["person2_id"]
-            other_name = bet["person2_name"]
-        else:
-            other_id = bet["person1_id"]
-            other_name = bet["person1_name"]
-
-        # Parse amount
-        amount_str = bet["amount"].replace("$", "").replace(",", "")
-        try:
-            amount = float(amount_str)
-        except:
-            amount = 0
-
-        if other_id not in debts:
-            debts[other_id] = {"name": other_name, "amount": 0}
-
-        # If user won, other owes them. If user lost, user owes other.
-        if winner_id == user_id:
-            debts[other_id]["amount"] += amount  # they owe you
-        else:
-            debts[other_id]["amount"] -= amount  # you owe them
-
-    return debts
+    """Get the user's net balance plus who they owe and who owes them."""
+    # Net debt between this user and each other user, in cents:
+    # positive = they owe you, negative = you owe them. Each half of the
+    # UNION ALL seeks one (person, status) index; the second skips bets where
+    # the user is on both sides so they aren't counted twice.
+    with _db_lock:
+        rows = get_db().execute(
+            """SELECT other_id, other_name, SUM(cents) AS amount_cents FROM (
+                   SELECT person2_id AS other_id, person2_name AS other_name,
+                          CASE WHEN winner_id = :user_id THEN amount_cents
+                               ELSE -amount_cents END AS cents
+                   FROM bets WHERE person1_id = :user_id AND status = 'settled'
+                   UNION ALL
+                   SELECT person1_id, person1_name,
+                          CASE WHEN winner_id = :user_id THEN amount_cents
+                               ELSE -amount_cents END
+                   FROM bets WHERE person2_id = :user_id AND status = 'settled'
+                       AND person1_id != :user_id
+               ) GROUP BY other_id""",
+            {"user_id": user_id},
+        ).fetchall()
+
+    # The balance is the sum of the debts with other people; a bet against
+    # yourself nets to zero, as it does in get_balances()
+    balance = sum(
+        row["amount_cents"] for row in rows if row["other_id"] != user_id
+    ) / 100
+
+    # other_user_id -> {'name': name, 'amount': net_amount}
+    debts = {
+        row["other_id"]: {"name": row["other_name"], "amount": row["amount_cents"] / 100}
+        for row in rows
+    }
+    return balance, debts
 
 
 def get_all_records():
-    """Get win/loss records for all users."""
-    conn = sqlite3.connect(DATABASE)
-    conn.row_factory = sqlite3.Row
-    c = conn.cursor()
-    c.execute("SELECT * FROM bets WHERE status = 'settled'")
-    rows = c.fetchall()
-    conn.close()
-
-    records = {}  # user_id -> {'name': name, 'wins': 0, 'losses': 0}
-
-    for bet in rows:
-        bet = dict(bet)
-        winner_id = bet["winner_id"]
-        loser_id = (
-            bet["person1_id"] if winner_id == bet["person2_id"] else bet["person2_id"]
-        )
-        winner_name = (
-            bet["person1_name"]
-            if winner_id == bet["person1_id"]
-            else bet["person2_name"]
-        )
-        loser_name = (
-            bet["person2_name"]
-            if winner_id == bet["person1_id"]
-            else bet["person1_name"]
+    """Get win/loss records for all users (cached)."""
+    global _records_cache
+    with _db_lock:
+        if _records_cache is not None:
+            return _records_cache
+        c = get_db().cursor()
+        c.row_factory = None
+        c.execute(
+            f"""SELECT user_id, name, SUM(won) AS wins, COUNT(*) - SUM(won) AS losses,
+                       COUNT(*) AS total, SUM(won) * 100.0 / COUNT(*) AS win_pct
+                FROM ({_SETTLED_PARTICIPANTS_SQL}) GROUP BY user_id"""
         )
 
-        # Update winner
-        if winner_id not in records:
-            records[winner_id] = {"name": winner_name, "wins": 0, "losses": 0}
-        records[winner_id]["wins"] += 1
-
-        # Update loser
-        if loser_id not in records:
-            records[loser_id] = {"name": loser_name, "wins": 0, "losses": 0}
-        records[loser_id]["losses"] += 1
-
-    # Calculate percentages
-    for user_id, data in records.items():
-        total = data["wins"] + data["losses"]
-        data["total"] = total
-        data["win_pct"] = (data["wins"] / total * 100) if total > 0 else 0
-
-    return records
+        # user_id -> {'name', 'wins', 'losses', 'total', 'win_pct'}
+        _records_cache = {
+            user_id: {
+                "name": name,
+                "wins": wins,
+                "losses": losses,
+                "total": total,
+                "win_pct": win_pct,
+            }
+            for user_id, name, wins, losses, total, win_pct in c.fetchall()
+        }
+        return _records_cache
 
 
 def get_user_history(user_id, limit=15):
-    """Get settled bets involving a specific user."""
-    conn = sqlite3.connect(DATABASE)
-    conn.row_factory = sqlite3.Row
-    c = conn.cursor()
-    c.execute(
-        """SELECT * FROM bets WHERE status = 'settled'
-                 AND (person1_id = ? OR person2_id = ?)
-                 ORDER BY resolved_at DESC LIMIT ?""",
-        (user_id, user_id, limit),
-    )
-    rows = c.fetchall()
-    conn.close()
-    return [dict(row) for row in rows]
+    """Get settled bets involving a specific user (cached)."""
+    key = (user_id, limit)
+    with _db_lock:
+        history = _history_cache.get(key)
+        if history is not None:
+            return history
+        history = _history_cache[key] = get_db().execute(
+            """SELECT * FROM bets WHERE person1_id = :user_id AND status = 'settled'
+               UNION ALL
+               SELECT * FROM bets WHERE person2_id = :user_id AND status = 'settled'
+                   AND person1_id != :user_id
+               ORDER BY resolved_at DESC, id DESC LIMIT :limit""",
+            {"user_id": user_id, "limit": limit},
+        ).fetchall()
+        return history
 
 
 # Parlay functions
-import json
 
 
 def add_parlay(user_id, user_name, channel_id, stake, legs, source="manual"):
     """Add a new parlay to track."""
-    conn = sqlite3.connect(DATABASE)
-    c = conn.cursor()
-
     # Calculate total odds (multiply all leg odds)
-    total_odds = 1.0
-    for leg in legs:
-        odds = leg.get("odds", 1.0)
-        if isinstance(odds, str):
-            odds = parse_odds(odds)
-        total_odds *= odds
+    total_odds = math.prod(
+        parse_odds(odds) if isinstance(odds, str) else odds
+        for odds in (leg.get("odds", 1.0) for leg in legs)
+    )
 
     # Calculate potential payout
     try:
@@ -422,74 +574,68 @@ def add_parlay(user_id, user_name, channel_id, stake, legs, source="manual"):
     except:
         potential_payout = 0
 
-    c.execute(
-        """
-        INSERT INTO parlays (user_id, user_name, channel_id, stake, total_odds,
-                            potential_payout, legs, status, created_at, source)
-        VALUES (?, ?, ?, ?, ?, ?, ?, 'open', ?, ?)
-    """,
-        (
-            user_id,
-            user_name,
-            channel_id,
-            str(stake),
-            f"{total_odds:.2f}",
-            f"${potential_payout:.2f}",
-            json.dumps(legs),
-            datetime.now().isoformat(),
-            source,
-        ),
-    )
-    parlay_id = c.lastrowid
-    conn.commit()
-    conn.close()
-    return parlay_id
+    with _db_lock:
+        row = get_db().execute(
+            """
+            INSERT INTO parlays (user_id, user_name, channel_id, stake, total_odds,
+                                potential_payout, legs, status, created_at, source)
+            VALUES (?, ?, ?, ?, ?, ?, ?, 'open', ?, ?)
+            RETURNING id
+        """,
+            (
+                user_id,
+                user_name,
+                channel_id,
+                str(stake),
+                f"{total_odds:.2f}",
+                f"${potential_payout:.2f}",
+                json.dumps(legs),
+                datetime.now().isoformat(),
+                source,
+            ),
+        ).fetchone()
+    return row[0]
 
 
 def get_user_parlays(user_id, status="open"):
     """Get parlays for a user."""
-    conn = sqlite3.connect(DATABASE)
-    conn.row_factory = sqlite3.Row
-    c = conn.cursor()
-    if status:
-        c.execute(
-            "SELECT * FROM parlays WHERE user_id = ? AND status = ? ORDER BY created_at DESC",
-            (user_id, status),
-        )
-    else:
-        c.execute(
+    with _db_lock:
+        if status:
+            return get_db().execute(
+                "SELECT * FROM parlays WHERE user_id = ? AND status = ? ORDER BY created_at DESC",
+                (user_id, status),
+            ).fetchall()
+        return get_db().execute(
             "SELECT * FROM parlays WHERE user_id = ? ORDER BY created_at DESC",
             (user_id,),
-        )
-    rows = c.fetchall()
-    conn.close()
-    return [dict(row) for row in rows]
+        ).fetchall()
 
 
 def get_parlay(parlay_id):
     """Get a specific parlay."""
-    conn = sqlite3.connect(DATABASE)
-    conn.row_factory = sqlite3.Row
-    c = conn.cursor()
-    c.execute("SELECT * FROM parlays WHERE id = ?", (parlay_id,))
-    row = c.fetchone()
-    conn.close()
-    return dict(row) if row else None
+    with _db_lock:
+        return get_db().execute(
+            "SELECT * FROM parlays WHERE id = ?", (parlay_id,)
+        ).fetchone()
 
 
 def update_parlay_status(parlay_id, status, result=None):
     """Update parlay status (won/lost/pushed)."""
-    conn = sqlite3.connect(DATABASE)
-    c = conn.cursor()
-    c.execute(
-        """
-        UPDATE parlays SET status = ?, result = ?, resolved_at = ?
-        WHERE id = ?
-    """,
-        (status, result, datetime.now().isoformat(), parlay_id),
-    )
-    conn.commit()
-    conn.close()
+    with _db_lock:
+        c = get_db().cursor()
+        c.execute(
+            """
+            UPDATE parlays SET status = ?, result = ?, resolved_at = ?
+            WHERE id = ?
+        """,
+            (status, result, datetime.now().isoformat(), parlay_id),
+        )
+
+
+def delete_parlay(parlay_id):
+    """Delete a parlay."""
+    with _db_lock:
+        get_db().execute("DELETE FROM parlays WHERE id = ?", (parlay_id,))
 
 
 # =============================================================================
@@ -498,15 +644,11 @@ def update_parlay_status(parlay_id, status, result=None):
 
 def get_cached_contract(player_name):
     """Get cached contract from database."""
-    conn = sqlite3.connect(DATABASE)
-    conn.row_factory = sqlite3.Row
-    c = conn.cursor()
-    c.execute(
-        "SELECT * FROM nba_contracts WHERE player_name_lower = ?",
-        (player_name.lower(),)
-    )
-    row = c.fetchone()
-    conn.close()
+    with _db_lock:
+        row = get_db().execute(
+            "SELECT * FROM nba_contracts WHERE player_name_lower = ?",
+            (player_name.lower(),)
+        ).fetchone()
     if row:
         # Check if cache is less than 7 days old
         updated = datetime.fromisoformat(row["updated_at"])
@@ -517,35 +659,33 @@ def get_cached_contract(player_name):
 
 def cache_contract(contract_data):
     """Cache contract data in database."""
-    conn = sqlite3.connect(DATABASE)
-    c = conn.cursor()
-    # Delete old entry if exists
-    c.execute(
-        "DELETE FROM nba_contracts WHERE player_name_lower = ?",
-        (contract_data["player_name"].lower(),)
-    )
-    c.execute(
-        """
-        INSERT INTO nba_contracts
-        (player_name, player_name_lower, team, years_remaining, current_salary,
-         total_value, contract_years, contract_details, free_agent_year, updated_at)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """,
-        (
-            contract_data["player_name"],
-            contract_data["player_name"].lower(),
-            contract_data.get("team", ""),
-            contract_data.get("years_remaining", 0),
-            contract_data.get("current_salary", ""),
-            contract_data.get("total_value", ""),
-            contract_data.get("contract_years", ""),
-            contract_data.get("contract_details", ""),
-            contract_data.get("free_agent_year", ""),
-            datetime.now().isoformat()
+    with _db_lock:
+        c = get_db().cursor()
+        # Delete old entry if exists
+        c.execute(
+            "DELETE FROM nba_contracts WHERE player_name_lower = ?",
+            (contract_data["player_name"].lower(),)
+        )
+        c.execute(
+            """
+            INSERT INTO nba_contracts
+            (player_name, player_name_lower, team, years_remaining, current_salary,
+             total_value, contract_years, contract_details, free_agent_year, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                contract_data["player_name"],
+                contract_data["player_name"].lower(),
+                contract_data.get("team", ""),
+                contract_data.get("years_remaining", 0),
+                contract_data.get("current_salary", ""),
+                contract_data.get("total_value", ""),
+                contract_data.get("contract_years", ""),
+                contract_data.get("contract_details", ""),
+                contract_data.get("free_agent_year", ""),
+                datetime.now().isoformat()
+            )
         )
-    )
-    conn.commit()
-    conn.close()
 
 
 def fetch_nba_contract(player_name):
@@ -562,7 +702,7 @@ def fetch_nba_contract(player_name):
             "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36"
         }
 
-        resp = requests.get(search_url, headers=headers, timeout=10, allow_redirects=True)
+        resp = _session.get(search_url, headers=headers, timeout=10, allow_redirects=True)
         if resp.status_code != 200:
             return None
 
@@ -673,7 +813,7 @@ def fetch_contract_hoopshype(player_name):
             "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36"
         }
 
-        resp = requests.get(url, headers=headers, timeout=10, allow_redirects=True)
+        resp = _session.get(url, headers=headers, timeout=10, allow_redirects=True)
         if resp.status_code != 200:
             return None
 
@@ -769,7 +909,7 @@ def fetch_contract_basketball_reference(player_name):
             player_id = f"{last[:5]}{first[:2]}{suffix}"
             url = f"https://www.basketball-reference.com/players/{last[0]}/{player_id}.html"
 
-            resp = requests.get(url, headers=headers, timeout=10)
+            resp = _session.get(url, headers=headers, timeout=10)
             if resp.status_code != 200:
                 continue
 
@@ -915,6 +1055,8 @@ def format_contract(contract):
     return "\n".join(lines)
 
 
+# Slips repeat a handful of odds strings; typed so 1 and 1.0 stay distinct
+@lru_cache(maxsize=256, typed=True)
 def parse_odds(odds_str):
     """Parse American or decimal odds to decimal multiplier."""
     odds_str = str(odds_str).strip()
@@ -941,12 +1083,22 @@ def parse_odds(odds_str):
     return 1.0  # Default if can't parse
 
 
+# Odds at the end of a parlay leg: "@ odds", "(odds)", decimal "2.50" or
+# American "+150". A signed integer after "@" is left to the American branch,
+# so the pick keeps the "@" exactly as when the patterns were tried in turn.
+_ODDS_RE = re.compile(
+    r"(?:@\s*(?P<at>(?![+-]\d+\s*$)[+-]?\d+\.?\d*)"
+    r"|\((?P<paren>[+-]?\d+\.?\d*)\)"
+    r"|\s(?P<dec>\d+\.\d+)"
+    r"|(?P<amer>[+-]\d+))\s*$"
+)
+
+
 def parse_parlay_text(text):
     """Parse parlay legs from text input."""
     legs = []
-    lines = text.strip().split("\n")
 
-    for line in lines:
+    for line in text.strip().split("\n"):
         line = line.strip()
         if not line or line.startswith("#"):
             continue
@@ -961,20 +1113,11 @@ def parse_parlay_text(text):
         leg = {"pick": line, "odds": 1.0}
 
         # Look for odds at the end
-        odds_patterns = [
-            r"([+-]\d+)\s*$",  # American odds at end: +150, -110
-            r"@\s*([+-]?\d+\.?\d*)\s*$",  # @ odds
-            r"\(([+-]?\d+\.?\d*)\)\s*$",  # (odds)
-            r"\s(\d+\.\d+)\s*$",  # Decimal odds: 2.50
-        ]
-
-        for pattern in odds_patterns:
-            match = re.search(pattern, line)
-            if match:
-                odds_str = match.group(1)
-                leg["odds"] = parse_odds(odds_str)
-                leg["pick"] = line[: match.start()].strip()
-                break
+        match = _ODDS_RE.search(line)
+        if match:
+            odds_str = match["amer"] or match["at"] or match["paren"] or match["dec"]
+            leg["odds"] = parse_odds(odds_str)
+            leg["pick"] = line[: match.start()].strip()
 
         if leg["pick"]:
             legs.append(leg)
@@ -1017,106 +1160,227 @@ def format_parlay(parlay):
 
 # DARKO projections storage (in-memory, updated when CSV uploaded)
 _darko_projections = {}
+_darko_by_last_name = {}  # last name -> projections sharing it
+_darko_by_normalized = {}  # name without punctuation/suffixes -> projection
 _darko_last_updated = None
 
 # The Odds API key
 ODDS_API_KEY = os.environ.get("ODDS_API_KEY", "")
 
 
+# Conditional-GET cache: (url, params) -> (etag, parsed body)
+_etag_cache = {}
+_etag_lock = threading.Lock()
+ETAG_CACHE_MAX = 64
+
+
+def get_json_revalidated(url, params=None, timeout=15):
+    """GET a JSON body, reusing our last copy when the server answers 304."""
+    key = (url, tuple(sorted((params or {}).items())))
+    cached = _etag_cache.get(key)
+    headers = {"If-None-Match": cached[0]} if cached else None
+    resp = _session.get(url, params=params, headers=headers, timeout=timeout)
+    if resp.status_code == 304 and cached:
+        return cached[1]
+
+    data = orjson.loads(resp.content)
+    etag = resp.headers.get("ETag")
+    # Only successful bodies are worth replaying on a later 304
+    if etag and resp.status_code == 200:
+        with _etag_lock:
+            _etag_cache.pop(key, None)
+            if len(_etag_cache) >= ETAG_CACHE_MAX:
+                _etag_cache.pop(next(iter(_etag_cache)), None)
+            _etag_cache[key] = (etag, data)
+    return data
+
+
+def fetch_event_props(event):
+    """Fetch points/assists/rebounds Over lines for one Odds API event."""
+    event_id = event["id"]
+    props_url = f"https://api.the-odds-api.com/v4/sports/basketball_nba/events/{event_id}/odds"
+    params = {
+        "apiKey": ODDS_API_KEY,
+        "regions": "us",
+        "markets": "player_points,player_assists,player_rebounds",
+        "oddsFormat": "american",
+    }
+
+    props = []
+    try:
+        props_data = get_json_revalidated(props_url, params=params)
+
+        # Parse the props
+        for bookmaker in props_data.get("bookmakers", [])[:1]:  # Just first bookmaker
+            for market in bookmaker.get("markets", []):
+                market_key = market.get("key", "")
+                for outcome in market.get("outcomes", []):
+                    player_name = outcome.get("description", "")
+                    line = outcome.get("point", 0)
+                    over_under = outcome.get("name", "")
+
+                    if player_name and line and over_under == "Over":
+                        if "points" in market_key:
+                            prop_type = "pts"
+                        elif "assists" in market_key:
+                            prop_type = "ast"
+                        elif "rebounds" in market_key:
+                            prop_type = "reb"
+                        else:
+                            continue
+                        props.append({
+                            "player": player_name,
+                            "type": prop_type,
+                            "line": line,
+                        })
+    except Exception as e:
+        logger.error(f"Error fetching props for event {event_id}: {e}")
+    return props
+
+
 def fetch_nba_player_props():
     """Fetch NBA player props from The Odds API."""
     try:
         # First get today's games
         events_url = f"https://api.the-odds-api.com/v4/sports/basketball_nba/events?apiKey={ODDS_API_KEY}"
-        resp = requests.get(events_url, timeout=15)
-        events = resp.json()
+        events = get_json_revalidated(events_url)
 
+        # Get props for each game concurrently (limit to first 5 to save API
+        # calls), keeping the results in event order
         all_props = []
-
-        # Get props for each game (limit to first 5 to save API calls)
-        for event in events[:5]:
-            event_id = event["id"]
-            props_url = f"https://api.the-odds-api.com/v4/sports/basketball_nba/events/{event_id}/odds"
-            params = {
-                "apiKey": ODDS_API_KEY,
-                "regions": "us",
-                "markets": "player_points,player_assists,player_rebounds",
-                "oddsFormat": "american",
-            }
-
-            try:
-                props_resp = requests.get(props_url, params=params, timeout=15)
-                props_data = props_resp.json()
-
-                # Parse the props
-                for bookmaker in props_data.get("bookmakers", [])[
-                    :1
-                ]:  # Just first bookmaker
-                    for market in bookmaker.get("markets", []):
-                        market_key = market.get("key", "")
-                        for outcome in market.get("outcomes", []):
-                            player_name = outcome.get("description", "")
-                            line = outcome.get("point", 0)
-                            over_under = outcome.get("name", "")
-
-                            if player_name and line and over_under == "Over":
-                                if "points" in market_key:
-                                    prop_type = "pts"
-                                elif "assists" in market_key:
-                                    prop_type = "ast"
-                                elif "rebounds" in market_key:
-                                    prop_type = "reb"
-                                else:
-                                    continue
-                                all_props.append({
-                                    "player": player_name,
-                                    "type": prop_type,
-                                    "line": line,
-                                })
-            except Exception as e:
-                logger.error(f"Error fetching props for event {event_id}: {e}")
-                continue
-
+        for props in _io_pool.map(fetch_event_props, events[:5]):
+            all_props.extend(props)
         return all_props
     except Exception as e:
         logger.error(f"Error fetching NBA props: {e}")
         return []
 
 
+_DARKO_FIELDS = ("name", "team", "minutes", "pts", "ast", "reb", "stl", "blk")
+
+
+# Punctuation and generational suffixes that vary between data sources
+_NAME_PUNCT_RE = re.compile(r"[.,'’]")
+_NAME_SUFFIXES = frozenset(("jr", "sr", "ii", "iii", "iv"))
+
+
+def _normalize_player_name(name):
+    """Lowercase a player name and drop punctuation and suffixes ("Jr.", "III")."""
+    words = _NAME_PUNCT_RE.sub("", name.lower()).split()
+    return " ".join(word for word in words if word not in _NAME_SUFFIXES)
+
+
+def set_darko_projections(projections, updated):
+    """Install projections (lowercased name -> row) and rebuild the indexes."""
+    global _darko_projections, _darko_by_last_name, _darko_by_normalized
+    global _darko_last_updated
+    by_last_name = {}
+    by_normalized = {}
+    for key, projection in projections.items():
+        by_last_name.setdefault(key.split()[-1], []).append(projection)
+        by_normalized.setdefault(_normalize_player_name(key), projection)
+
+    _darko_projections = projections
+    _darko_by_last_name = by_last_name
+    _darko_by_normalized = by_normalized
+    _darko_last_updated = updated
+
+
 def parse_darko_csv(csv_content):
-    """Parse DARKO CSV content into a dictionary by player name."""
-    global _darko_projections, _darko_last_updated
+    """Parse DARKO CSV content into a dictionary by player name and store it.
+
+    csv_content is the CSV text, or an iterable of its lines (e.g. a text stream).
+    """
     import csv as csv_module
     from io import StringIO
 
-    projections = {}
-    reader = csv_module.DictReader(StringIO(csv_content))
+    if isinstance(csv_content, str):
+        csv_content = StringIO(csv_content)
+    reader = csv_module.reader(csv_content)
+    header = next(reader, [])
+
+    # Column positions from the header; missing columns read as empty
+    position = {name: i for i, name in enumerate(header)}
+    player_i, team_i, min_i, pts_i, ast_i, dreb_i, oreb_i, stl_i, blk_i = (
+        position.get(name)
+        for name in (
+            "Player", "Team", "Minutes", "PTS", "AST", "DREB", "OREB", "STL", "BLK"
+        )
+    )
+
+    def cell(row, i):
+        return row[i] if i is not None and i < len(row) else ""
 
+    projections = {}
     for row in reader:
-        player = row.get("Player", "").strip()
+        player = cell(row, player_i).strip()
         if player:
             projections[player.lower()] = {
                 "name": player,
-                "team": row.get("Team", ""),
-                "minutes": float(row.get("Minutes", 0) or 0),
-                "pts": float(row.get("PTS", 0) or 0),
-                "ast": float(row.get("AST", 0) or 0),
-                "reb": float(row.get("DREB", 0) or 0) + float(row.get("OREB", 0) or 0),
-                "stl": float(row.get("STL", 0) or 0),
-                "blk": float(row.get("BLK", 0) or 0),
+                "team": cell(row, team_i),
+                "minutes": float(cell(row, min_i) or 0),
+                "pts": float(cell(row, pts_i) or 0),
+                "ast": float(cell(row, ast_i) or 0),
+                "reb": float(cell(row, dreb_i) or 0) + float(cell(row, oreb_i) or 0),
+                "stl": float(cell(row, stl_i) or 0),
+                "blk": float(cell(row, blk_i) or 0),
             }
 
-    _darko_projections = projections
-    _darko_last_updated = datetime.now()
+    updated = datetime.now()
+    with transaction() as conn:
+        conn.execute("DELETE FROM darko_projections")
+        conn.executemany(
+            """INSERT INTO darko_projections
+               (name_lower, name, team, minutes, pts, ast, reb, stl, blk, updated_at)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+            [
+                (key, *(p[field] for field in _DARKO_FIELDS), updated.isoformat())
+                for key, p in projections.items()
+            ],
+        )
+
+    set_darko_projections(projections, updated)
     return len(projections)
 
 
+def load_darko_projections():
+    """Load the last uploaded DARKO projections from the database."""
+    with _db_lock:
+        c = get_db().cursor()
+        c.execute("SELECT * FROM darko_projections ORDER BY rowid")
+        rows = c.fetchall()
+    if rows:
+        set_darko_projections(
+            {row["name_lower"]: {f: row[f] for f in _DARKO_FIELDS} for row in rows},
+            datetime.fromisoformat(rows[0]["updated_at"]),
+        )
+    return len(rows)
+
+
+def find_darko_projection(player_name):
+    """Find the DARKO projection for a lowercased player name, or None."""
+    darko = _darko_projections.get(player_name)
+    if darko:
+        return darko
+
+    # A last name only counts if exactly one DARKO player has it
+    last_name = player_name.split()[-1] if player_name else ""
+    if len(last_name) > 3:
+        candidates = _darko_by_last_name.get(last_name, ())
+        if len(candidates) == 1:
+            return candidates[0]
+
+    # Suffix/punctuation variants ("Jr." vs "Jr", "P.J." vs "PJ")
+    return _darko_by_normalized.get(_normalize_player_name(player_name))
+
+
+@ttl_cache(INJURIES_CACHE_TTL)
 def fetch_nba_injuries():
     """Fetch NBA injury report from ESPN."""
     try:
         url = "https://site.api.espn.com/apis/site/v2/sports/basketball/nba/injuries"
-        resp = requests.get(url, timeout=15)
-        data = resp.json()
+        resp = _session.get(url, timeout=15)
+        data = orjson.loads(resp.content)
 
         injuries = []
         for team_data in data.get("injuries", []):
@@ -1152,9 +1416,9 @@ def compare_darko_to_props():
 
     if not props:
         # Fall back to just showing projections
-        players = list(_darko_projections.values())
-        top_pts = sorted(players, key=lambda x: x["pts"], reverse=True)[:15]
-        top_ast = sorted(players, key=lambda x: x["ast"], reverse=True)[:15]
+        players = _darko_projections.values()
+        top_pts = heapq.nlargest(15, players, key=lambda x: x["pts"])
+        top_ast = heapq.nlargest(15, players, key=lambda x: x["ast"])
         return {
             "top_pts": top_pts,
             "top_ast": top_ast,
@@ -1175,20 +1439,7 @@ def compare_darko_to_props():
         line = prop["line"]
         prop_type = prop["type"]
 
-        # Find matching DARKO projection
-        darko = None
-        for key, val in _darko_projections.items():
-            # Match by last name or full name
-            if player_name in key or key in player_name:
-                darko = val
-                break
-            # Try matching last name
-            prop_last = player_name.split()[-1] if player_name else ""
-            darko_last = key.split()[-1] if key else ""
-            if prop_last == darko_last and len(prop_last) > 3:
-                darko = val
-                break
-
+        darko = find_darko_projection(player_name)
         if darko:
             if prop_type == "pts":
                 darko_proj = darko["pts"]
@@ -1224,20 +1475,56 @@ def compare_darko_to_props():
                     "edge": "OVER" if delta > 0 else "UNDER",
                 })
 
-    # Sort by absolute delta (biggest edges first)
-    edges_pts.sort(key=lambda x: abs(x["delta"]), reverse=True)
-    edges_ast.sort(key=lambda x: abs(x["delta"]), reverse=True)
-    edges_reb.sort(key=lambda x: abs(x["delta"]), reverse=True)
+    # Keep the biggest edges by absolute delta (ties stay in prop order)
+    def biggest(edges):
+        return heapq.nlargest(10, edges, key=lambda x: abs(x["delta"]))
 
     return {
-        "edges_pts": edges_pts[:10],
-        "edges_ast": edges_ast[:10],
-        "edges_reb": edges_reb[:10],
+        "edges_pts": biggest(edges_pts),
+        "edges_ast": biggest(edges_ast),
+        "edges_reb": biggest(edges_reb),
         "last_updated": _darko_last_updated,
         "props_found": True,
     }, None
 
 
+@dataclass(slots=True)
+class GameOdds:
+    """A game's betting line from the ESPN scoreboard."""
+
+    home: str
+    away: str
+    status: str
+    spread: str | None = None
+    total: float | None = None
+    details: str | None = None
+    score: str | None = None  # "away-home", once the game has started
+    # Lowercased "home\0away" for team searches; the NUL separator keeps a
+    # query from matching across the home/away boundary
+    _search: str = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self._search = f"{self.home}\0{self.away}".lower()
+
+
+@dataclass(slots=True)
+class GameScore:
+    """A game's score from the ESPN scoreboard."""
+
+    id: str | None
+    name: str | None
+    date: str | None
+    status: str
+    completed: bool
+    home_team: str
+    home_abbrev: str
+    home_score: str
+    away_team: str
+    away_abbrev: str
+    away_score: str
+    winner: str | None = None
+
+
 # ESPN API for odds (they have betting data now)
 ODDS_SPORTS = {
     "nba": "basketball/nba",
@@ -1251,6 +1538,7 @@ ODDS_SPORTS = {
 }
 
 
+@ttl_cache(ODDS_CACHE_TTL)
 def fetch_odds(sport):
     """Fetch betting odds from ESPN."""
     sport_path = ODDS_SPORTS.get(sport.lower())
@@ -1260,8 +1548,8 @@ def fetch_odds(sport):
     try:
         # ESPN scoreboard with odds
         url = f"https://site.api.espn.com/apis/site/v2/sports/{sport_path}/scoreboard"
-        resp = requests.get(url, timeout=10)
-        data = resp.json()
+        resp = _session.get(url, timeout=10)
+        data = orjson.loads(resp.content)
         games = []
 
         for event in data.get("events", [])[:8]:
@@ -1271,25 +1559,20 @@ def fetch_odds(sport):
             if len(competitors) < 2:
                 continue
 
-            home = next(
-                (c for c in competitors if c.get("homeAway") == "home"), competitors[0]
-            )
-            away = next(
-                (c for c in competitors if c.get("homeAway") == "away"), competitors[1]
+            # ESPN lists the two sides in either order; homeAway says which
+            if competitors[0].get("homeAway") == "away":
+                away, home = competitors[0], competitors[1]
+            else:
+                home, away = competitors[0], competitors[1]
+            home_team = home.get("team", {})
+            away_team = away.get("team", {})
+
+            game_info = GameOdds(
+                home=home_team.get("displayName", ""),
+                away=away_team.get("displayName", ""),
+                status=event.get("status", {}).get("type", {}).get("shortDetail", ""),
             )
 
-            game_info = {
-                "home": home.get("team", {}).get("displayName", ""),
-                "away": away.get("team", {}).get("displayName", ""),
-                "status": event
-                .get("status", {})
-                .get("type", {})
-                .get("shortDetail", ""),
-                "spread": None,
-                "total": None,
-                "moneyline": {},
-            }
-
             # Get odds from competition
             odds_list = competition.get("odds", [])
             if odds_list:
@@ -1299,27 +1582,27 @@ def fetch_odds(sport):
                     fav = odds.get("favoriteTeamId")
                     if fav:
                         fav_name = (
-                            home["team"]["displayName"]
-                            if home["team"].get("id") == fav
-                            else away["team"]["displayName"]
+                            game_info.home
+                            if home_team.get("id") == fav
+                            else game_info.away
                         )
-                        game_info["spread"] = f"{fav_name} {float(spread_val):+.1f}"
+                        game_info.spread = f"{fav_name} {float(spread_val):+.1f}"
                     else:
-                        game_info["spread"] = f"{spread_val}"
+                        game_info.spread = f"{spread_val}"
 
                 if odds.get("overUnder"):
-                    game_info["total"] = odds.get("overUnder")
+                    game_info.total = odds.get("overUnder")
 
                 # Moneyline from details
                 details = odds.get("details", "")
                 if details:
-                    game_info["details"] = details
+                    game_info.details = details
 
             # Add score if game started
             if competition.get("status", {}).get("type", {}).get("state") != "pre":
                 home_score = home.get("score", "0")
                 away_score = away.get("score", "0")
-                game_info["score"] = f"{away_score}-{home_score}"
+                game_info.score = f"{away_score}-{home_score}"
 
             games.append(game_info)
 
@@ -1331,17 +1614,17 @@ def fetch_odds(sport):
 
 def format_odds(game):
     """Format game odds for display."""
-    lines = [f"*{game['away']} @ {game['home']}*"]
-    lines.append(f"  {game.get('status', '')}")
-
-    if game.get("score"):
-        lines.append(f"  Score: {game['score']}")
-    if game.get("spread"):
-        lines.append(f"  Spread: {game['spread']}")
-    if game.get("total"):
-        lines.append(f"  O/U: {game['total']}")
-    if game.get("details"):
-        lines.append(f"  {game['details']}")
+    lines = [f"*{game.away} @ {game.home}*"]
+    lines.append(f"  {game.status}")
+
+    if game.score:
+        lines.append(f"  Score: {game.score}")
+    if game.spread:
+        lines.append(f"  Spread: {game.spread}")
+    if game.total:
+        lines.append(f"  O/U: {game.total}")
+    if game.details:
+        lines.append(f"  {game.details}")
 
     return "\n".join(lines)
 
@@ -1350,43 +1633,80 @@ def format_odds(game):
 KALSHI_API_BASE = "https://api.elections.kalshi.com/trade-api/v2"
 
 
+@ttl_cache(KALSHI_CACHE_TTL)
 def fetch_kalshi_markets(limit=200, status="open"):
     """Fetch markets from Kalshi."""
     try:
         url = f"{KALSHI_API_BASE}/markets"
         params = {"limit": limit, "status": status}
-        resp = requests.get(url, params=params, timeout=15)
-        data = resp.json()
+        resp = _session.get(url, params=params, timeout=15)
+        data = orjson.loads(resp.content)
         return data.get("markets", [])
     except Exception as e:
         logger.error(f"Error fetching Kalshi markets: {e}")
         return None
 
 
+# Token index over the last Kalshi market list: (markets, token -> positions)
+_kalshi_index = None
+
+
+def index_kalshi_markets(markets):
+    """Map each whitespace token of the searchable fields to market positions."""
+    postings = {}
+    for i, market in enumerate(markets):
+        searchable = " ".join((
+            market.get("ticker", ""),
+            market.get("event_ticker", ""),
+            market.get("yes_sub_title", ""),
+            market.get("no_sub_title", ""),
+        )).lower()
+        for token in searchable.split():
+            postings.setdefault(token, set()).add(i)
+    return postings
+
+
+def _kalshi_vol(market):
+    """A market's 24h volume as a number (0 if missing or malformed)."""
+    try:
+        return float(market.get("volume_24h_fp") or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
 def search_kalshi_markets(query, limit=10):
     """Search Kalshi markets by keyword."""
+    global _kalshi_index
     markets = fetch_kalshi_markets(limit=500)
     if not markets:
         return None
 
-    query_lower = query.lower()
-    query_words = query_lower.split()
-
-    matches = []
-    for market in markets:
-        ticker = market.get("ticker", "").lower()
-        event_ticker = market.get("event_ticker", "").lower()
-        yes_title = market.get("yes_sub_title", "").lower()
-        no_title = market.get("no_sub_title", "").lower()
-
-        # Check if any query word matches
-        searchable = f"{ticker} {event_ticker} {yes_title} {no_title}"
-        if all(word in searchable for word in query_words):
-            matches.append(market)
+    # Rebuild the index only when the cached market list is refreshed
+    index = _kalshi_index
+    if index is None or index[0] is not markets:
+        index = _kalshi_index = (markets, index_kalshi_markets(markets))
+    postings = index[1]
+
+    # Every query word must appear within some token of the market; words
+    # never contain whitespace, so matching against the token vocabulary is
+    # the same as a substring test on the joined fields
+    candidates = None
+    for word in query.lower().split():
+        hits = set()
+        for token, positions in postings.items():
+            if word in token:
+                hits |= positions
+        candidates = hits if candidates is None else candidates & hits
+        if not candidates:
+            return []
+
+    if candidates is None:
+        matches = markets
+    else:
+        matches = [markets[i] for i in sorted(candidates)]
 
-    # Sort by volume (most active first)
-    matches.sort(key=lambda m: float(m.get("volume_24h_fp", "0") or "0"), reverse=True)
-    return matches[:limit]
+    # Most active first
+    return heapq.nlargest(limit, matches, key=_kalshi_vol)
 
 
 def format_kalshi_market(market):
@@ -1450,6 +1770,15 @@ ESPN_SCOREBOARD = {
 }
 
 
+def _parse_score(score):
+    """Parse an ESPN score string, treating anything unparseable as 0."""
+    try:
+        return int(score)
+    except (TypeError, ValueError):
+        return 0
+
+
+@ttl_cache(SCORES_CACHE_TTL)
 def fetch_scores(sport):
     """Fetch recent scores from ESPN API."""
     url = ESPN_SCOREBOARD.get(sport.lower())
@@ -1457,8 +1786,8 @@ def fetch_scores(sport):
         return None
 
     try:
-        resp = requests.get(url, timeout=10)
-        data = resp.json()
+        resp = _session.get(url, timeout=10)
+        data = orjson.loads(resp.content)
         games = []
 
         for event in data.get("events", []):
@@ -1468,41 +1797,33 @@ def fetch_scores(sport):
             if len(competitors) >= 2:
                 home = competitors[0]
                 away = competitors[1]
+                home_team = home.get("team", {})
+                away_team = away.get("team", {})
+
+                status_type = event.get("status", {}).get("type", {})
+                game = GameScore(
+                    id=event.get("id"),
+                    name=event.get("name"),
+                    date=event.get("date"),
+                    status=status_type.get("description", "Unknown"),
+                    completed=status_type.get("completed", False),
+                    home_team=home_team.get("displayName", "Unknown"),
+                    home_abbrev=home_team.get("abbreviation", ""),
+                    home_score=home.get("score", "0"),
+                    away_team=away_team.get("displayName", "Unknown"),
+                    away_abbrev=away_team.get("abbreviation", ""),
+                    away_score=away.get("score", "0"),
+                )
 
-                game = {
-                    "id": event.get("id"),
-                    "name": event.get("name"),
-                    "date": event.get("date"),
-                    "status": event
-                    .get("status", {})
-                    .get("type", {})
-                    .get("description", "Unknown"),
-                    "completed": event
-                    .get("status", {})
-                    .get("type", {})
-                    .get("completed", False),
-                    "home_team": home.get("team", {}).get("displayName", "Unknown"),
-                    "home_abbrev": home.get("team", {}).get("abbreviation", ""),
-                    "home_score": home.get("score", "0"),
-                    "away_team": away.get("team", {}).get("displayName", "Unknown"),
-                    "away_abbrev": away.get("team", {}).get("abbreviation", ""),
-                    "away_score": away.get("score", "0"),
-                    "winner": None,
-                }
-
-                if game["completed"]:
-                    home_score = (
-                        int(game["home_score"]) if game["home_score"].isdigit() else 0
-                    )
-                    away_score = (
-                        int(game["away_score"]) if game["away_score"].isdigit() else 0
-                    )
+                if game.completed:
+                    home_score = _parse_score(game.home_score)
+                    away_score = _parse_score(game.away_score)
                     if home_score > away_score:
-                        game["winner"] = game["home_team"]
+                        game.winner = game.home_team
                     elif away_score > home_score:
-                        game["winner"] = game["away_team"]
+                        game.winner = game.away_team
                     else:
-                        game["winner"] = "Tie"
+                        game.winner = "Tie"
 
                 games.append(game)
 
@@ -1512,152 +1833,311 @@ def fetch_scores(sport):
         return None
 
 
-def match_bet_to_game(bet_description, games):
-    """Try to match a bet description to a game result."""
-    desc_lower = bet_description.lower()
+def fetch_all_scores(sports):
+    """Fetch scores for several sports concurrently, combined in sport order."""
+    all_games = []
+    for games in _io_pool.map(fetch_scores, sports):
+        if games:
+            all_games.extend(games)
+    return all_games
+
+
+def clear_fetch_caches():
+    """Drop cached scores, odds, injuries and Kalshi markets."""
+    for fetcher in (
+        fetch_scores,
+        fetch_odds,
+        fetch_nba_injuries,
+        fetch_kalshi_markets,
+    ):
+        fetcher.cache.clear()
 
-    for game in games:
-        if not game["completed"]:
-            continue
 
-        # Check if any team name or abbreviation is in the bet description
-        teams = [
-            game["home_team"].lower(),
-            game["away_team"].lower(),
-            game["home_abbrev"].lower(),
-            game["away_abbrev"].lower(),
-        ]
+def index_game_teams(games):
+    """Index completed games' lowercased team names and abbreviations.
 
+    Returns (game_teams, by_prefix): game_teams pairs each completed game with
+    its names, and by_prefix maps each name's first three letters to positions
+    in game_teams, so a bet only has to be checked against games sharing one of
+    its three-letter substrings.
+    """
+    game_teams = [
+        (
+            game,
+            [
+                team.lower()
+                for team in (
+                    game.home_team,
+                    game.away_team,
+                    game.home_abbrev,
+                    game.away_abbrev,
+                )
+                if team and len(team) > 2
+            ],
+        )
+        for game in games
+        if game.completed
+    ]
+
+    by_prefix = {}
+    for position, (game, teams) in enumerate(game_teams):
         for team in teams:
-            if team and len(team) > 2 and team in desc_lower:
-                return game
+            by_prefix.setdefault(team[:3], set()).add(position)
+
+    return game_teams, by_prefix
+
+
+def match_bet_to_game(bet_description, games, game_index=None):
+    """Try to match a bet description to a game result.
+
+    When matching many bets against the same games, build game_index once
+    with index_game_teams(games) and pass it in.
+    """
+    game_teams, by_prefix = game_index or index_game_teams(games)
+    desc_lower = bet_description.lower()
+
+    # A team name can only be in the description if its first three letters
+    # are, so only games indexed under one of the description's 3-letter
+    # substrings are candidates (checked in original game order)
+    candidates = set()
+    for i in range(len(desc_lower) - 2):
+        positions = by_prefix.get(desc_lower[i : i + 3])
+        if positions:
+            candidates |= positions
+
+    # Check if any team name or abbreviation is in the bet description
+    for position in sorted(candidates):
+        game, teams = game_teams[position]
+        if any(team in desc_lower for team in teams):
+            return game
 
     return None
 
 
 def format_game(game):
     """Format a game for display."""
-    if game["completed"]:
+    if game.completed:
         return (
-            f"{game['away_team']} {game['away_score']} @ "
-            f"{game['home_team']} {game['home_score']} (Final) "
-            f"- Winner: {game['winner']}"
+            f"{game.away_team} {game.away_score} @ "
+            f"{game.home_team} {game.home_score} (Final) "
+            f"- Winner: {game.winner}"
         )
     else:
         return (
-            f"{game['away_team']} {game['away_score']} @ "
-            f"{game['home_team']} {game['home_score']} ({game['status']})"
+            f"{game.away_team} {game.away_score} @ "
+            f"{game.home_team} {game.home_score} ({game.status})"
         )
 
 
 # Initialize Slack app
 app = App(token=os.environ.get("SLACK_BOT_TOKEN"))
 
+# Bot's own user ID (looked up once via auth.test) and a regex for its mention
+_bot_user_id = None
+_bot_mention_re = None
+_bot_user_lock = threading.Lock()
+
+
+def get_bot_user_id(client):
+    """Get the bot's user ID, calling auth.test only on first use."""
+    global _bot_user_id, _bot_mention_re
+    if _bot_user_id is None:
+        with _bot_user_lock:
+            if _bot_user_id is None:
+                user_id = client.auth_test()["user_id"]
+                _bot_mention_re = re.compile(re.escape(f"<@{user_id}>"))
+                _bot_user_id = user_id
+    return _bot_user_id
+
+
+# Display names: user_id -> (fetched_at, name)
+NAME_CACHE_TTL = 3600
+NAME_CACHE_MAX = 4096
+_name_cache = {}
+_name_lock = threading.Lock()
+
+
+def _cache_user_name(user_id, name):
+    """Store a display name, evicting the oldest entry once the cache is full."""
+    with _name_lock:
+        _name_cache.pop(user_id, None)
+        if len(_name_cache) >= NAME_CACHE_MAX:
+            _name_cache.pop(next(iter(_name_cache)), None)
+        _name_cache[user_id] = (time.monotonic(), name)
+
 
 def get_user_name(client, user_id):
     """Get display name for a user ID."""
+    with _name_lock:
+        cached = _name_cache.get(user_id)
+    if cached and time.monotonic() - cached[0] < NAME_CACHE_TTL:
+        return cached[1]
+
     try:
         result = client.users_info(user=user_id)
         user = result["user"]
-        return user.get("real_name") or user.get("name") or user_id
+        name = user.get("real_name") or user.get("name") or user_id
     except:
         return user_id
 
+    _cache_user_name(user_id, name)
+    return name
 
-def parse_bet_message(text, bot_user_id, sender_id):
-    """Parse a bet from a message. Returns dict or None."""
-    # Remove bot mention
-    text = re.sub(f"<@{bot_user_id}>", "", text).strip()
-
-    # Pattern: @person1 vs @person2 $amount description
-    pattern = r"<@(\w+)>\s+(?:vs\.?|versus)\s+<@(\w+)>\s+\$?(\d+(?:\.\d{2})?)\s+(.+)"
-    match = re.search(pattern, text, re.IGNORECASE)
-    if match:
-        return {
-            "person1_id": match.group(1),
-            "person2_id": match.group(2),
-            "amount": f"${match.group(3)}",
-            "description": match.group(4).strip(),
-        }
 
-    # Pattern: @person1 owes @person2 $amount [for description]
-    pattern = r"<@(\w+)>\s+owes\s+<@(\w+)>\s+\$?(\d+(?:\.\d{2})?)\s*(?:for\s+)?(.*)"
-    match = re.search(pattern, text, re.IGNORECASE)
-    if match:
-        return {
-            "person1_id": match.group(1),
-            "person2_id": match.group(2),
-            "amount": f"${match.group(3)}",
-            "description": match.group(4).strip() or "debt",
-        }
+def prefetch_users(client):
+    """Fill the display-name cache from users.list, one API call per page."""
+    try:
+        for page in client.users_list(limit=200):
+            for user in page["members"]:
+                user_id = user["id"]
+                name = user.get("real_name") or user.get("name") or user_id
+                _cache_user_name(user_id, name)
+    except Exception as e:
+        logger.error(f"Error prefetching users: {e}")
 
-    # Flexible pattern: "I bet @person amount ..." or "bet @person amount ..."
-    pattern = r"(?:i\s+)?bet\s+<@(\w+)>\s+\$?(\d+(?:\.\d{2})?)\s*(.*)"
-    match = re.search(pattern, text, re.IGNORECASE)
-    if match:
-        return {
-            "person1_id": sender_id,
-            "person2_id": match.group(1),
-            "amount": f"${match.group(2)}",
-            "description": match.group(3).strip() or "bet",
-        }
 
-    # Flexible pattern: "@person amount on/that/for ..."
-    pattern = r"<@(\w+)>\s+\$?(\d+(?:\.\d{2})?)\s+(?:on|that|for)?\s*(.*)"
-    match = re.search(pattern, text, re.IGNORECASE)
-    if match:
-        return {
-            "person1_id": sender_id,
-            "person2_id": match.group(1),
-            "amount": f"${match.group(2)}",
-            "description": match.group(3).strip() or "bet",
-        }
+# Bet message patterns, tried in order by parse_bet_message
+_VS_RE = re.compile(
+    r"<@(\w+)>\s+(?:vs\.?|versus)\s+<@(\w+)>\s+\$?(\d+(?:\.\d{2})?)\s+(.+)",
+    re.IGNORECASE,
+)
+_OWES_RE = re.compile(
+    r"<@(\w+)>\s+owes\s+<@(\w+)>\s+\$?(\d+(?:\.\d{2})?)\s*(?:for\s+)?(.*)",
+    re.IGNORECASE,
+)
+_BET_RE = re.compile(
+    r"(?:i\s+)?bet\s+<@(\w+)>\s+\$?(\d+(?:\.\d{2})?)\s*(.*)", re.IGNORECASE
+)
+_ON_RE = re.compile(
+    r"<@(\w+)>\s+\$?(\d+(?:\.\d{2})?)\s+(?:on|that|for)?\s*(.*)", re.IGNORECASE
+)
+_AGAINST_RE = re.compile(
+    r"\$?(\d+(?:\.\d{2})?)\s+(?:with|against|vs)?\s*<@(\w+)>\s*(.*)", re.IGNORECASE
+)
 
-    # Flexible pattern: "amount with/against @person ..."
-    pattern = r"\$?(\d+(?:\.\d{2})?)\s+(?:with|against|vs)?\s*<@(\w+)>\s*(.*)"
-    match = re.search(pattern, text, re.IGNORECASE)
-    if match:
+# The forms above in priority order, with the words a form needs (any of them,
+# lowercased) before it's worth trying, fused so one scan usually settles it
+_BET_FORMS = (
+    (_VS_RE, ("vs", "versus")),
+    (_OWES_RE, ("owes",)),
+    (_BET_RE, ("bet",)),
+    (_ON_RE, ()),
+    (_AGAINST_RE, ()),
+)
+_BET_ANY_RE = re.compile(
+    "|".join(f"(?P<f{i}>{form.pattern})" for i, (form, _) in enumerate(_BET_FORMS)),
+    re.IGNORECASE,
+)
+
+_MENTION_RE = re.compile(r"<@(\w+)>")
+_DOLLAR_RE = re.compile(r"\$(\d+(?:\.\d{2})?)")
+_STANDALONE_RE = re.compile(r"(?:^|[\s,])(\d{2,})(?:[\s,.]|$)")
+_LEADING_WORD_RE = re.compile(r"^(bet|i bet|on|that|for)\s*", re.IGNORECASE)
+
+
+def match_bet_form(text, text_lower):
+    """Find the first bet form matching the text. Returns (index, groups) or None.
+
+    Forms are tried in _BET_FORMS order, each only if the lowercased text has
+    one of its words, exactly as if searched one by one.
+    """
+    allowed = [
+        not words or any(word in text_lower for word in words)
+        for _, words in _BET_FORMS
+    ]
+    match = _BET_ANY_RE.search(text)
+    if not match:
+        return None
+
+    # The alternation finds the leftmost match; a higher-priority form can
+    # only win by matching further along, so check those from there
+    index = int(match.lastgroup[1:])
+    for form_index in range(index):
+        if allowed[form_index]:
+            later = _BET_FORMS[form_index][0].search(text, match.start() + 1)
+            if later:
+                return form_index, later.groups()
+
+    if allowed[index]:
+        offset = match.lastindex
+        return index, match.groups()[offset : offset + _BET_FORMS[index][0].groups]
+
+    # Matched only by case-folding the form's word (rare); try forms one by one
+    for form_index, (form, _) in enumerate(_BET_FORMS):
+        if allowed[form_index]:
+            found = form.search(text)
+            if found:
+                return form_index, found.groups()
+    return None
+
+
+def parse_bet_message(text, sender_id):
+    """Parse a bet from a message (bot mention already removed). Returns dict or None."""
+    # Every bet form needs an @mention; skip the patterns when there isn't one
+    if "<@" not in text:
+        return None
+
+    form = match_bet_form(text, text.lower())
+    if form:
+        index, groups = form
+        if index == 0:
+            # @person1 vs @person2 $amount description
+            person1_id, person2_id, amount, desc = groups
+            desc = desc.strip()
+        elif index == 1:
+            # @person1 owes @person2 $amount [for description]
+            person1_id, person2_id, amount, desc = groups
+            desc = desc.strip() or "debt"
+        elif index == 4:
+            # "amount with/against @person ..."
+            person1_id = sender_id
+            amount, person2_id, desc = groups
+            desc = desc.strip() or "bet"
+        else:
+            # "I bet @person amount ..." or "@person amount on/that/for ..."
+            person1_id = sender_id
+            person2_id, amount, desc = groups
+            desc = desc.strip() or "bet"
         return {
-            "person1_id": sender_id,
-            "person2_id": match.group(2),
-            "amount": f"${match.group(1)}",
-            "description": match.group(3).strip() or "bet",
+            "person1_id": person1_id,
+            "person2_id": person2_id,
+            "amount": f"${amount}",
+            "description": desc,
         }
 
     # Last resort: find any @mention and any number
-    mentions = re.findall(r"<@(\w+)>", text)
+    mentions = _MENTION_RE.findall(text)
 
     # Find amounts - look for $ followed by numbers, or standalone numbers that look like bets
     # Prioritize amounts with $ sign, then larger numbers
-    dollar_amounts = re.findall(r"\$(\d+(?:\.\d{2})?)", text)
+    dollar_amounts = _DOLLAR_RE.findall(text)
 
     # For numbers without $, only match if they're standalone (not part of IDs)
     # Look for numbers preceded by space/start and followed by space/end
-    standalone_amounts = re.findall(r"(?:^|[\s,])(\d{2,})(?:[\s,.]|$)", text)
-
-    # Combine and prioritize: dollar amounts first, then standalone numbers
-    amounts = dollar_amounts + standalone_amounts
+    standalone_amounts = _STANDALONE_RE.findall(text)
 
-    # Filter out the bot mention and get valid amounts (>= 1)
-    mentions = [m for m in mentions if m != bot_user_id]
-    amounts = [a for a in amounts if float(a) >= 1]
-
-    # Sort amounts by value descending (prefer larger numbers as they're more likely the bet)
-    amounts = sorted(amounts, key=lambda x: float(x), reverse=True)
+    # Combine and prioritize: dollar amounts first, then standalone numbers.
+    # Keep (value, text) pairs of valid amounts (>= 1) so each is parsed once
+    amounts = [(float(a), a) for a in dollar_amounts + standalone_amounts]
+    amounts = [pair for pair in amounts if pair[0] >= 1]
 
     if mentions and amounts:
-        # Use the largest amount found (most likely the actual bet amount)
-        bet_amount = amounts[0]
+        # Use the largest amount found (most likely the actual bet amount);
+        # max() keeps the first of equal values, so $ amounts win ties
+        bet_amount = max(amounts, key=lambda pair: pair[0])[1]
 
         # Remove mentions and amount from text to get description
-        desc = text
-        for m in mentions:
-            desc = re.sub(f"<@{m}>", "", desc)
-        desc = re.sub(rf"\$?{re.escape(bet_amount)}", "", desc, count=1)
-        desc = re.sub(r"\s+", " ", desc).strip()
-        desc = re.sub(
-            r"^(bet|i bet|on|that|for)\s*", "", desc, flags=re.IGNORECASE
-        ).strip()
+        desc = _MENTION_RE.sub("", text)
+        # Drop the first occurrence of the amount, with its "$" if it has one
+        # (a per-amount pattern would be compiled anew for most messages)
+        start = desc.find(bet_amount)
+        if start >= 0:
+            end = start + len(bet_amount)
+            if start and desc[start - 1] == "$":
+                start -= 1
+            desc = desc[:start] + desc[end:]
+        desc = " ".join(desc.split())
+        desc = _LEADING_WORD_RE.sub("", desc).strip()
 
         if len(mentions) >= 2:
             return {
@@ -1680,15 +2160,33 @@ def parse_bet_message(text, bot_user_id, sender_id):
 def format_bet(bet, quiet=True):
     """Format a bet for display. Use quiet=True to avoid @mentions."""
     if quiet:
-        return (
-            f"*#{bet['id']}* - {bet['person1_name']} vs {bet['person2_name']} "
-            f"for {bet['amount']}: {bet['description']}"
-        )
+        person1, person2 = bet["person1_name"], bet["person2_name"]
     else:
-        return (
-            f"*#{bet['id']}* - <@{bet['person1_id']}> vs <@{bet['person2_id']}> "
-            f"for {bet['amount']}: {bet['description']}"
-        )
+        person1, person2 = f"<@{bet['person1_id']}>", f"<@{bet['person2_id']}>"
+    return (
+        f"*#{bet['id']}* - {person1} vs {person2} "
+        f"for {bet['amount']}: {bet['description']}"
+    )
+
+
+def format_resolved_bet(bet):
+    """Format a settled/cancelled bet for the history listing."""
+    status = bet["status"]
+    if status == "settled":
+        status = f"won by <@{bet['winner_id']}>"
+    return (
+        f"#{bet['id']} - {bet['person1_name']} vs {bet['person2_name']} "
+        f"for {bet['amount']}: {bet['description']} [{status}]"
+    )
+
+
+def format_balance(name, balance):
+    """Format one leaderboard row."""
+    if balance > 0:
+        return f"{name}: +${balance:.2f}"
+    elif balance < 0:
+        return f"{name}: -${abs(balance):.2f}"
+    return f"{name}: $0.00"
 
 
 @app.event("app_mention")
@@ -1698,16 +2196,86 @@ def handle_mention(event, say, client):
     channel_id = event.get("channel")
     user_id = event.get("user")
 
-    # Get bot's user ID
-    auth = client.auth_test()
-    bot_user_id = auth["user_id"]
+    # Look up the bot's user ID (also sets _bot_mention_re)
+    get_bot_user_id(client)
 
-    # Clean text (remove bot mention)
-    clean_text = re.sub(f"<@{bot_user_id}>", "", text).strip().lower()
+    # Remove bot mention; keep original case where user IDs matter
+    text_no_bot = _bot_mention_re.sub("", text).strip()
+    clean_text = text_no_bot.lower()
 
     # Handle commands
-    if clean_text in ("commands", "command", "cmds", "cmd"):
-        say("""*Commands:*
+    handler = COMMANDS.get(clean_text)
+    if handler:
+        handler(event, say, client)
+        return
+
+    # Parameterized commands, picked by the first word
+    words = clean_text.split(None, 1)
+    first_word = words[0] if words else ""
+    for matcher, handler, keep_case in PREFIX_COMMANDS.get(first_word, ()):
+        match = matcher(text_no_bot if keep_case else clean_text)
+        if match:
+            handler(match, event, say, client)
+            return
+
+    # Settle phrasings can appear anywhere in the message
+    settle = match_settle_command(text_no_bot, clean_text)
+    if settle:
+        cmd_settle(settle, event, say, client)
+        return
+
+    # Try to parse as a new bet
+    bet_data = parse_bet_message(text_no_bot, user_id)
+    if bet_data:
+        if parse_amount_cents(bet_data["amount"]) is None:
+            say(f"That bet is too big. The limit is ${MAX_BET_CENTS // 100:,}.")
+            return
+
+        # Look both names up at once so the two users.info calls overlap
+        person1_future = _io_pool.submit(get_user_name, client, bet_data["person1_id"])
+        person2_name = get_user_name(client, bet_data["person2_id"])
+        person1_name = person1_future.result()
+
+        bet_id = add_bet(
+            channel_id=channel_id,
+            person1_id=bet_data["person1_id"],
+            person1_name=person1_name,
+            person2_id=bet_data["person2_id"],
+            person2_name=person2_name,
+            amount=bet_data["amount"],
+            description=bet_data["description"],
+            created_by=user_id,
+        )
+
+        say(
+            f"Bet #{bet_id} recorded! <@{bet_data['person1_id']}> vs <@{bet_data['person2_id']}> "
+            f"for {bet_data['amount']}: {bet_data['description']}"
+        )
+        return
+
+    # Didn't understand
+    say("I didn't understand that. Try `@betbot help` for usage info.")
+
+
+# Command handlers and the patterns for parameterized commands
+_PARLAY_ADD_RE = re.compile(
+    r"parlay\s+(?:add|new|create)\s+\$?(\d+(?:\.\d{2})?)\s*(.*)", re.DOTALL
+)
+_PARLAY_MULTILINE_RE = re.compile(
+    r"parlay\s+\$?(\d+(?:\.\d{2})?)\s*\n(.+)", re.DOTALL | re.IGNORECASE
+)
+_PARLAY_RESULT_RE = re.compile(
+    r"parlay\s+(\d+)\s+(won|win|lost|lose|push|pushed|delete|cancel|remove)"
+)
+_SCORES_RE = re.compile(r"scores?\s*(\w+)?")
+_LINES_RE = re.compile(r"(?:lines?|odds|spread|spreads|betting)\s*(.*)")
+_KALSHI_RE = re.compile(r"(?:kalshi|predict|prediction|market|markets)\s*(.*)")
+_CONTRACT_RE = re.compile(r"contract (.*)", re.DOTALL)
+_CANCEL_RE = re.compile(r"cancel\s+(\d+)\s*$")
+
+
+# Replies for the help commands
+COMMANDS_TEXT = """*Commands:*
 • `list` - Open bets in this channel
 • `all` - All open bets
 • `mybets` - Your open bets
@@ -1726,13 +2294,12 @@ def handle_mention(event, say, client):
 • `props` - DARKO projections (upload CSV first)
 • `injury` - NBA injury report
 • `contract <player>` - NBA contract info
+• `refresh` - Refetch scores/lines instead of cached data
 • `settle <id> @winner` - Settle a bet
 • `cancel <id>` - Cancel a bet
-• `help` - Full help""")
-        return
+• `help` - Full help"""
 
-    if clean_text == "help":
-        say("""*Bet Tracker Bot Help*
+HELP_TEXT = """*Bet Tracker Bot Help*
 
 *Log a bet:*
 `@betbot @alice vs @bob $50 on the game`
@@ -1762,556 +2329,501 @@ Over 220.5 -110```
 - `@betbot props` - Show DARKO projections (PTS, AST)
 - `@betbot injury` - Show NBA injury report
 - `@betbot contract <player>` - NBA player contract info
+- `@betbot refresh` - Clear cached scores, lines and markets
 - `@betbot balance` - Check your balance
 - `@betbot balances` - Show everyone's balances
 - `@betbot myhistory` - Show your bet history
 - `@betbot help` - Show this help
 
-_Tip: Upload DARKO CSV for prop projections!_""")
-        return
+_Tip: Upload DARKO CSV for prop projections!_"""
 
-    if clean_text in ("list", "bets", "open", "openbets", "open bets"):
-        bets = get_open_bets(channel_id)
-        if not bets:
-            say("No open bets in this channel!")
-        else:
-            lines = ["*Open Bets in this channel:*"]
-            for bet in bets:
-                lines.append(format_bet(bet))
-            say("\n".join(lines))
-        return
 
-    if clean_text in ("listall", "list all", "all", "all bets", "allbets"):
-        bets = get_open_bets()
-        if not bets:
-            say("No open bets anywhere!")
-        else:
-            lines = ["*All Open Bets:*"]
-            for bet in bets:
-                lines.append(format_bet(bet))
-            say("\n".join(lines))
-        return
+def cmd_commands(event, say, client):
+    """Show the short command list."""
+    say(COMMANDS_TEXT)
 
-    if clean_text in ("history", "recent", "resolved", "past", "past bets"):
-        bets = get_resolved_bets(channel_id)
-        if not bets:
-            say("No bet history in this channel!")
-        else:
-            lines = ["*Recent Bet History:*"]
-            for bet in bets:
-                status = bet["status"]
-                if status == "settled":
-                    status = f"won by <@{bet['winner_id']}>"
-                lines.append(
-                    f"#{bet['id']} - {bet['person1_name']} vs {bet['person2_name']} "
-                    f"for {bet['amount']}: {bet['description']} [{status}]"
-                )
-            say("\n".join(lines))
-        return
 
-    # Balance command - check your own balance
-    if clean_text in ("balance", "mybalance", "my balance"):
-        user_balance = get_user_balance(user_id)
-        balance = user_balance["balance"]
-        debts = get_user_debts(user_id)
-
-        lines = []
-        if balance > 0:
-            lines.append(f"*You are up ${balance:.2f}*")
-        elif balance < 0:
-            lines.append(f"*You are down ${abs(balance):.2f}*")
-        else:
-            lines.append(f"*You are even*")
-
-        # Show individual debts (use names, not @mentions)
-        you_owe = []
-        they_owe = []
-        for other_id, data in debts.items():
-            if data["amount"] > 0:
-                they_owe.append(f"{data['name']} owes you ${data['amount']:.2f}")
-            elif data["amount"] < 0:
-                you_owe.append(f"You owe {data['name']} ${abs(data['amount']):.2f}")
-
-        if you_owe:
-            lines.append("\n" + "\n".join(you_owe))
-        if they_owe:
-            lines.append("\n" + "\n".join(they_owe))
-
-        say("\n".join(lines))
-        return
+def cmd_help(event, say, client):
+    """Show the full help text."""
+    say(HELP_TEXT)
 
-    # Balances/leaderboard command - show everyone
-    if clean_text in ("balances", "leaderboard", "standings", "all balances"):
-        balances = get_balances()
-        if not balances:
-            say("No settled bets yet - no balances to show!")
-            return
 
-        # Sort by balance descending
-        sorted_balances = sorted(
-            balances.items(), key=lambda x: x[1]["balance"], reverse=True
+def cmd_list(event, say, client):
+    """Show open bets in this channel."""
+    channel_id = event.get("channel")
+    bets = get_open_bets(channel_id)
+    if not bets:
+        say("No open bets in this channel!")
+    else:
+        say(
+            "*Open Bets in this channel:*\n"
+            + "\n".join(format_bet(bet) for bet in bets)
         )
 
-        lines = ["*Leaderboard:*"]
-        for user_id_key, data in sorted_balances:
-            balance = data["balance"]
-            name = data["name"]
-            if balance > 0:
-                lines.append(f"{name}: +${balance:.2f}")
-            elif balance < 0:
-                lines.append(f"{name}: -${abs(balance):.2f}")
-            else:
-                lines.append(f"{name}: $0.00")
 
-        say("\n".join(lines))
+def cmd_list_all(event, say, client):
+    """Show open bets in every channel."""
+    bets = get_open_bets()
+    if not bets:
+        say("No open bets anywhere!")
+    else:
+        say("*All Open Bets:*\n" + "\n".join(format_bet(bet) for bet in bets))
+
+
+def cmd_history(event, say, client):
+    """Show recently resolved bets in this channel."""
+    channel_id = event.get("channel")
+    bets = get_resolved_bets(channel_id)
+    if not bets:
+        say("No bet history in this channel!")
+    else:
+        say(
+            "*Recent Bet History:*\n"
+            + "\n".join(format_resolved_bet(bet) for bet in bets)
+        )
+
+
+def cmd_balance(event, say, client):
+    """Show the caller's balance and debts."""
+    user_id = event.get("user")
+    balance, debts = get_user_debts(user_id)
+
+    lines = []
+    if balance > 0:
+        lines.append(f"*You are up ${balance:.2f}*")
+    elif balance < 0:
+        lines.append(f"*You are down ${abs(balance):.2f}*")
+    else:
+        lines.append(f"*You are even*")
+
+    # Show individual debts (use names, not @mentions)
+    you_owe = []
+    they_owe = []
+    for other_id, data in debts.items():
+        if data["amount"] > 0:
+            they_owe.append(f"{data['name']} owes you ${data['amount']:.2f}")
+        elif data["amount"] < 0:
+            you_owe.append(f"You owe {data['name']} ${abs(data['amount']):.2f}")
+
+    if you_owe:
+        lines.append("\n" + "\n".join(you_owe))
+    if they_owe:
+        lines.append("\n" + "\n".join(they_owe))
+
+    say("\n".join(lines))
+
+
+def cmd_balances(event, say, client):
+    """Show the leaderboard."""
+    balances = get_balances()
+    if not balances:
+        say("No settled bets yet - no balances to show!")
         return
 
-    # My open bets command
-    if clean_text in ("mybets", "my bets", "myopen", "my open"):
-        all_open = get_open_bets()
-        my_bets = [
-            b
-            for b in all_open
-            if b["person1_id"] == user_id or b["person2_id"] == user_id
-        ]
-
-        if not my_bets:
-            say("You have no open bets!")
-            return
+    # Sort by balance descending
+    ranked = sorted(balances.values(), key=lambda data: data["balance"], reverse=True)
+    say(
+        "*Leaderboard:*\n"
+        + "\n".join(format_balance(data["name"], data["balance"]) for data in ranked)
+    )
+
 
-        lines = ["*Your Open Bets:*"]
-        for bet in my_bets:
-            lines.append(format_bet(bet))
+def cmd_mybets(event, say, client):
+    """Show the caller's open bets."""
+    user_id = event.get("user")
+    my_bets = get_open_bets_for_user(user_id)
 
-        say("\n".join(lines))
+    if not my_bets:
+        say("You have no open bets!")
         return
 
-    # My history command - show user's bet history
-    if clean_text in ("myhistory", "my history"):
-        bets = get_user_history(user_id)
-        if not bets:
-            say("You have no bet history yet!")
-            return
+    say("*Your Open Bets:*\n" + "\n".join(format_bet(bet) for bet in my_bets))
 
-        lines = ["*Your Bet History:*"]
-        wins = 0
-        losses = 0
-        for bet in bets:
-            if bet["winner_id"] == user_id:
-                result = "WON"
-                wins += 1
-            else:
-                result = "LOST"
-                losses += 1
-
-            # Use name instead of @mention
-            opponent_name = (
-                bet["person2_name"]
-                if bet["person1_id"] == user_id
-                else bet["person1_name"]
-            )
-            lines.append(
-                f"• {result} {bet['amount']} vs {opponent_name}: {bet['description']}"
-            )
 
-        lines.append(f"\n*Record: {wins}W - {losses}L*")
-        say("\n".join(lines))
+def cmd_myhistory(event, say, client):
+    """Show the caller's bet history and record."""
+    user_id = event.get("user")
+    bets = get_user_history(user_id)
+    if not bets:
+        say("You have no bet history yet!")
         return
 
-    # Wall of shame - worst win percentages
-    if clean_text in ("shame", "wall of shame", "wallofshame", "losers", "worst"):
-        records = get_all_records()
-        if not records:
-            say("No settled bets yet!")
-            return
+    lines = ["*Your Bet History:*"]
+    wins = 0
+    losses = 0
+    for bet in bets:
+        if bet["winner_id"] == user_id:
+            result = "WON"
+            wins += 1
+        else:
+            result = "LOST"
+            losses += 1
 
-        # Sort by win percentage (lowest first), require at least 2 bets
-        sorted_records = sorted(
-            [(uid, data) for uid, data in records.items() if data["total"] >= 2],
-            key=lambda x: x[1]["win_pct"],
+        # Use name instead of @mention
+        opponent_name = (
+            bet["person2_name"]
+            if bet["person1_id"] == user_id
+            else bet["person1_name"]
+        )
+        lines.append(
+            f"• {result} {bet['amount']} vs {opponent_name}: {bet['description']}"
         )
 
-        if not sorted_records:
-            say("Not enough bets to determine the wall of shame!")
-            return
+    lines.append(f"\n*Record: {wins}W - {losses}L*")
+    say("\n".join(lines))
 
-        lines = ["*Wall of Shame:*"]
-        for i, (uid, data) in enumerate(sorted_records[:5]):
-            lines.append(
-                f"{i + 1}. {data['name']}: {data['wins']}W-{data['losses']}L ({data['win_pct']:.0f}%)"
-            )
 
-        say("\n".join(lines))
+def cmd_shame(event, say, client):
+    """Show the worst win percentages."""
+    records = get_all_records()
+    if not records:
+        say("No settled bets yet!")
         return
 
-    # Parlay commands
-    if clean_text in ("parlay", "parlays", "myparlay", "myparlays", "my parlays"):
-        parlays = get_user_parlays(user_id, status="open")
-        if not parlays:
-            say(
-                "You have no open parlays! Add one with:\n`@betbot parlay add $10`\nThen list your legs (one per line)"
-            )
-        else:
-            lines = ["*Your Open Parlays:*\n"]
-            for parlay in parlays:
-                lines.append(format_parlay(parlay))
-                lines.append("")
-            say("\n".join(lines))
-        return
+    # Sort by win percentage (lowest first), require at least 2 bets
+    sorted_records = sorted(
+        [(uid, data) for uid, data in records.items() if data["total"] >= 2],
+        key=lambda x: x[1]["win_pct"],
+    )
 
-    if clean_text in ("parlay history", "parlays history", "parlay all"):
-        parlays = get_user_parlays(user_id, status=None)
-        if not parlays:
-            say("You have no parlay history!")
-        else:
-            lines = ["*Your Parlay History:*\n"]
-            for parlay in parlays[:10]:
-                lines.append(format_parlay(parlay))
-                lines.append("")
-            say("\n".join(lines))
+    if not sorted_records:
+        say("Not enough bets to determine the wall of shame!")
         return
 
-    # Parlay add command
-    parlay_add_match = re.match(
-        r"parlay\s+(?:add|new|create)\s+\$?(\d+(?:\.\d{2})?)\s*(.*)",
-        clean_text,
-        re.DOTALL,
+    rows = (
+        f"{i}. {data['name']}: {data['wins']}W-{data['losses']}L "
+        f"({data['win_pct']:.0f}%)"
+        for i, (uid, data) in enumerate(sorted_records[:5], 1)
     )
-    if parlay_add_match:
-        stake = parlay_add_match.group(1)
-        legs_text = parlay_add_match.group(2).strip()
+    say("*Wall of Shame:*\n" + "\n".join(rows))
 
-        if not legs_text:
-            say(
-                f"Got it! Adding a ${stake} parlay. Now reply with your legs, one per line:\n```\nLakers ML +150\nChiefs -3 -110\nOver 48.5 -110\n```"
-            )
-            # Store pending parlay in memory (simple approach)
-            return
 
-        legs = parse_parlay_text(legs_text)
-        if not legs:
-            say(
-                "Couldn't parse any legs. Format each leg like:\n`Team/Pick +odds` or `Team/Pick -odds`"
-            )
-            return
+def cmd_parlays(event, say, client):
+    """Show the caller's open parlays."""
+    user_id = event.get("user")
+    parlays = get_user_parlays(user_id, status="open")
+    if not parlays:
+        say(
+            "You have no open parlays! Add one with:\n`@betbot parlay add $10`\nThen list your legs (one per line)"
+        )
+    else:
+        sections = (format_parlay(parlay) for parlay in parlays)
+        say("*Your Open Parlays:*\n\n" + "\n\n".join(sections) + "\n")
 
-        user_name = get_user_name(client, user_id)
-        parlay_id = add_parlay(user_id, user_name, channel_id, f"${stake}", legs)
 
-        parlay = get_parlay(parlay_id)
-        say(f"Parlay #{parlay_id} added!\n\n{format_parlay(parlay)}")
+def cmd_parlay_history(event, say, client):
+    """Show the caller's parlay history."""
+    user_id = event.get("user")
+    parlays = get_user_parlays(user_id, status=None)
+    if not parlays:
+        say("You have no parlay history!")
+    else:
+        sections = (format_parlay(parlay) for parlay in parlays[:10])
+        say("*Your Parlay History:*\n\n" + "\n\n".join(sections) + "\n")
+
+
+def cmd_parlay_add(match, event, say, client):
+    """Add a parlay from "parlay add $amt <legs>"."""
+    channel_id = event.get("channel")
+    user_id = event.get("user")
+    stake = match.group(1)
+    legs_text = match.group(2).strip()
+
+    if not legs_text:
+        say(
+            f"Got it! Adding a ${stake} parlay. Now reply with your legs, one per line:\n```\nLakers ML +150\nChiefs -3 -110\nOver 48.5 -110\n```"
+        )
+        # Store pending parlay in memory (simple approach)
         return
 
-    # Parlay with multiline (when someone posts legs after "parlay add")
-    parlay_multiline_match = re.match(
-        r"parlay\s+\$?(\d+(?:\.\d{2})?)\s*\n(.+)",
-        text.replace(f"<@{bot_user_id}>", "").strip(),
-        re.DOTALL | re.IGNORECASE,
-    )
-    if parlay_multiline_match:
-        stake = parlay_multiline_match.group(1)
-        legs_text = parlay_multiline_match.group(2).strip()
-
-        legs = parse_parlay_text(legs_text)
-        if not legs:
-            say(
-                "Couldn't parse any legs. Format each leg like:\n`Team/Pick +odds` or `Team/Pick -odds`"
-            )
-            return
+    legs = parse_parlay_text(legs_text)
+    if not legs:
+        say(
+            "Couldn't parse any legs. Format each leg like:\n`Team/Pick +odds` or `Team/Pick -odds`"
+        )
+        return
+
+    user_name = get_user_name(client, user_id)
+    parlay_id = add_parlay(user_id, user_name, channel_id, f"${stake}", legs)
 
-        user_name = get_user_name(client, user_id)
-        parlay_id = add_parlay(user_id, user_name, channel_id, f"${stake}", legs)
+    parlay = get_parlay(parlay_id)
+    say(f"Parlay #{parlay_id} added!\n\n{format_parlay(parlay)}")
 
-        parlay = get_parlay(parlay_id)
-        say(f"Parlay #{parlay_id} added!\n\n{format_parlay(parlay)}")
+
+def cmd_parlay_multiline(match, event, say, client):
+    """Add a parlay from "parlay $amt" followed by legs on new lines."""
+    channel_id = event.get("channel")
+    user_id = event.get("user")
+    stake = match.group(1)
+    legs_text = match.group(2).strip()
+
+    legs = parse_parlay_text(legs_text)
+    if not legs:
+        say(
+            "Couldn't parse any legs. Format each leg like:\n`Team/Pick +odds` or `Team/Pick -odds`"
+        )
         return
 
-    # Parlay won/lost/delete commands
-    parlay_result_match = re.match(
-        r"parlay\s+(\d+)\s+(won|win|lost|lose|push|pushed|delete|cancel|remove)",
-        clean_text,
-    )
-    if parlay_result_match:
-        parlay_id = int(parlay_result_match.group(1))
-        result = parlay_result_match.group(2).lower()
+    user_name = get_user_name(client, user_id)
+    parlay_id = add_parlay(user_id, user_name, channel_id, f"${stake}", legs)
 
-        parlay = get_parlay(parlay_id)
-        if not parlay:
-            say(f"Parlay #{parlay_id} not found!")
-            return
-        if parlay["user_id"] != user_id:
-            say("You can only update your own parlays!")
-            return
+    parlay = get_parlay(parlay_id)
+    say(f"Parlay #{parlay_id} added!\n\n{format_parlay(parlay)}")
 
-        if result in ("won", "win"):
-            update_parlay_status(parlay_id, "won", parlay["potential_payout"])
-            say(
-                f"Parlay #{parlay_id} marked as WON! You won {parlay['potential_payout']}!"
-            )
-        elif result in ("lost", "lose"):
-            update_parlay_status(parlay_id, "lost")
-            say(f"Parlay #{parlay_id} marked as LOST. Better luck next time!")
-        elif result in ("delete", "cancel", "remove"):
-            conn = sqlite3.connect(DATABASE)
-            c = conn.cursor()
-            c.execute("DELETE FROM parlays WHERE id = ?", (parlay_id,))
-            conn.commit()
-            conn.close()
-            say(f"Parlay #{parlay_id} deleted.")
-        else:
-            update_parlay_status(parlay_id, "pushed")
-            say(f"Parlay #{parlay_id} marked as PUSHED.")
+
+def cmd_parlay_result(match, event, say, client):
+    """Mark a parlay won/lost/pushed, or delete it."""
+    user_id = event.get("user")
+    parlay_id = int(match.group(1))
+    result = match.group(2).lower()
+
+    parlay = get_parlay(parlay_id)
+    if not parlay:
+        say(f"Parlay #{parlay_id} not found!")
+        return
+    if parlay["user_id"] != user_id:
+        say("You can only update your own parlays!")
         return
 
-    # Scores command
-    scores_match = re.match(r"scores?\s*(\w+)?", clean_text)
-    if scores_match:
-        sport = scores_match.group(1) or "nba"
-        sport = sport.lower()
+    if result in ("won", "win"):
+        update_parlay_status(parlay_id, "won", parlay["potential_payout"])
+        say(
+            f"Parlay #{parlay_id} marked as WON! You won {parlay['potential_payout']}!"
+        )
+    elif result in ("lost", "lose"):
+        update_parlay_status(parlay_id, "lost")
+        say(f"Parlay #{parlay_id} marked as LOST. Better luck next time!")
+    elif result in ("delete", "cancel", "remove"):
+        delete_parlay(parlay_id)
+        say(f"Parlay #{parlay_id} deleted.")
+    else:
+        update_parlay_status(parlay_id, "pushed")
+        say(f"Parlay #{parlay_id} marked as PUSHED.")
 
-        if sport not in ESPN_SCOREBOARD:
-            say(f"Unknown sport '{sport}'. Try: nba, nfl, soccer, epl")
-            return
 
-        games = fetch_scores(sport)
-        if not games:
-            say(f"Couldn't fetch {sport.upper()} scores right now.")
-            return
+def cmd_scores(match, event, say, client):
+    """Show recent scores for a sport."""
+    sport = match.group(1) or "nba"
+    sport = sport.lower()
 
-        lines = [f"*{sport.upper()} Scores:*"]
-        for game in games[:10]:
-            lines.append(format_game(game))
+    if sport not in ESPN_SCOREBOARD:
+        say(f"Unknown sport '{sport}'. Try: nba, nfl, soccer, epl")
+        return
 
-        say("\n".join(lines))
+    games = fetch_scores(sport)
+    if not games:
+        say(f"Couldn't fetch {sport.upper()} scores right now.")
         return
 
-    # Betting lines/odds command
-    lines_match = re.match(r"(?:lines?|odds|spread|spreads|betting)\s*(.*)", clean_text)
-    if lines_match:
-        query = lines_match.group(1).strip().lower() or "nba"
+    rows = (format_game(game) for game in games[:10])
+    say(f"*{sport.upper()} Scores:*\n" + "\n".join(rows))
 
-        # Check if it's a sport
-        if query in ODDS_SPORTS:
-            games = fetch_odds(query)
-            if not games:
-                say(f"No games/odds found for {query.upper()}")
-                return
 
-            lines = [f"*{query.upper()} Lines:*\n"]
-            for game in games:
-                lines.append(format_odds(game))
-                lines.append("")
+def cmd_lines(match, event, say, client):
+    """Show betting lines for a sport or team."""
+    query = match.group(1).strip().lower() or "nba"
 
-            say("\n".join(lines))
+    # Check if it's a sport
+    if query in ODDS_SPORTS:
+        games = fetch_odds(query)
+        if not games:
+            say(f"No games/odds found for {query.upper()}")
             return
 
-        # Otherwise search for team name across sports
-        all_games = []
-        for sport in ["nba", "nfl", "mlb", "nhl"]:
-            games = fetch_odds(sport)
-            if games:
-                for game in games:
-                    game["sport"] = sport.upper()
-                    all_games.append(game)
-
-        # Filter by team name
-        matching = []
-        for game in all_games:
-            if (
-                query in game.get("home", "").lower()
-                or query in game.get("away", "").lower()
-            ):
-                matching.append(game)
-
-        if not matching:
-            say(
-                f"No games found for '{query}'. Try a team name or sport (nba, nfl, mlb, nhl)"
-            )
-            return
+        sections = (format_odds(game) for game in games)
+        say(f"*{query.upper()} Lines:*\n\n" + "\n\n".join(sections) + "\n")
+        return
 
-        lines = [f"*Lines for '{query}':*\n"]
-        for game in matching:
-            lines.append(f"_{game.get('sport', '')}:_")
-            lines.append(format_odds(game))
-            lines.append("")
+    # Otherwise search for team name across sports (fetched concurrently),
+    # keeping (sport, game) for games whose home or away team matches
+    sports = ["nba", "nfl", "mlb", "nhl"]
+    matching = [
+        (sport.upper(), game)
+        for sport, games in zip(sports, _io_pool.map(fetch_odds, sports))
+        for game in games or ()
+        if query in game._search
+    ]
 
-        say("\n".join(lines))
+    if not matching:
+        say(
+            f"No games found for '{query}'. Try a team name or sport (nba, nfl, mlb, nhl)"
+        )
         return
 
-    # Kalshi prediction market command
-    kalshi_match = re.match(
-        r"(?:kalshi|predict|prediction|market|markets)\s*(.*)", clean_text
-    )
-    if kalshi_match:
-        query = kalshi_match.group(1).strip()
-
-        if not query:
-            # Show trending/popular markets
-            markets = fetch_kalshi_markets(limit=100)
-            if not markets:
-                say("Couldn't fetch Kalshi markets right now.")
-                return
-
-            # Sort by 24h volume
-            markets.sort(
-                key=lambda m: float(m.get("volume_24h_fp", "0") or "0"), reverse=True
-            )
-            top_markets = markets[:8]
+    sections = (f"_{sport}:_\n{format_odds(game)}" for sport, game in matching)
+    say(f"*Lines for '{query}':*\n\n" + "\n\n".join(sections) + "\n")
 
-            lines = ["*Trending Prediction Markets (Kalshi):*\n"]
-            for market in top_markets:
-                lines.append(format_kalshi_market(market))
-                lines.append("")
 
-            say("\n".join(lines))
-            return
+def cmd_kalshi(match, event, say, client):
+    """Show trending or matching Kalshi markets."""
+    query = match.group(1).strip()
 
-        # Search for markets
-        markets = search_kalshi_markets(query)
+    if not query:
+        # Show trending/popular markets
+        markets = fetch_kalshi_markets(limit=100)
         if not markets:
-            say(f"No prediction markets found for '{query}'. Try different keywords.")
+            say("Couldn't fetch Kalshi markets right now.")
             return
 
-        lines = [f"*Prediction Markets for '{query}':*\n"]
-        for market in markets[:8]:
-            lines.append(format_kalshi_market(market))
-            lines.append("")
+        # Most active by 24h volume
+        top_markets = heapq.nlargest(8, markets, key=_kalshi_vol)
 
-        say("\n".join(lines))
+        sections = (format_kalshi_market(market) for market in top_markets)
+        say(
+            "*Trending Prediction Markets (Kalshi):*\n\n"
+            + "\n\n".join(sections)
+            + "\n"
+        )
         return
 
-    # Check command - auto-match bets to scores
-    if clean_text == "check":
-        open_bets = get_open_bets(channel_id)
-        if not open_bets:
-            say("No open bets to check!")
-            return
+    # Search for markets
+    markets = search_kalshi_markets(query)
+    if not markets:
+        say(f"No prediction markets found for '{query}'. Try different keywords.")
+        return
 
-        # Fetch scores from all sports
-        all_games = []
-        for sport in ["nba", "nfl", "soccer", "epl"]:
-            games = fetch_scores(sport)
-            if games:
-                all_games.extend(games)
-
-        matches = []
-        for bet in open_bets:
-            game = match_bet_to_game(bet["description"], all_games)
-            if game:
-                matches.append((bet, game))
-
-        if not matches:
-            say(
-                "Couldn't auto-match any bets to recent games. You can settle manually with `settle <id> winner @person`"
-            )
-            return
+    sections = (format_kalshi_market(market) for market in markets[:8])
+    say(f"*Prediction Markets for '{query}':*\n\n" + "\n\n".join(sections) + "\n")
 
-        lines = ["*Potential bet matches found:*"]
-        for bet, game in matches:
-            lines.append(f"\n*Bet #{bet['id']}*: {bet['description']}")
-            lines.append(f"  Matched game: {game['away_team']} vs {game['home_team']}")
-            lines.append(
-                f"  Result: {game['away_score']} - {game['home_score']}, Winner: {game['winner']}"
-            )
-            lines.append(f"  → To settle: `@betbot settle {bet['id']} winner @person`")
 
-        say("\n".join(lines))
+def cmd_check(event, say, client):
+    """Match open bets in this channel against recent scores."""
+    channel_id = event.get("channel")
+    open_bets = get_open_bets(channel_id)
+    if not open_bets:
+        say("No open bets to check!")
         return
 
-    # Check parlays - show parlays with live scores
-    if clean_text in ("check parlays", "parlay check", "check parlay", "parlays check"):
-        parlays = get_user_parlays(user_id, status="open")
-        if not parlays:
-            say("You have no open parlays!")
-            return
+    # Fetch scores from all sports
+    all_games = fetch_all_scores(["nba", "nfl", "soccer", "epl"])
+
+    game_index = index_game_teams(all_games)
+    matches = []
+    for bet in open_bets:
+        game = match_bet_to_game(bet["description"], all_games, game_index)
+        if game:
+            matches.append((bet, game))
+
+    if not matches:
+        say(
+            "Couldn't auto-match any bets to recent games. You can settle manually with `settle <id> winner @person`"
+        )
+        return
+
+    sections = (
+        f"*Bet #{bet['id']}*: {bet['description']}\n"
+        f"  Matched game: {game.away_team} vs {game.home_team}\n"
+        f"  Result: {game.away_score} - {game.home_score}, Winner: {game.winner}\n"
+        f"  → To settle: `@betbot settle {bet['id']} winner @person`"
+        for bet, game in matches
+    )
+    say("*Potential bet matches found:*\n\n" + "\n\n".join(sections))
 
-        # Fetch live scores from all sports
-        all_games = []
-        for sport in ["nba", "nfl", "mlb", "nhl"]:
-            games = fetch_scores(sport)
-            if games:
-                all_games.extend(games)
 
-        lines = [f"*Live Parlay Status* ({len(all_games)} games tracked)\n"]
+def cmd_check_parlays(event, say, client):
+    """Show the caller's open parlays with live scores."""
+    user_id = event.get("user")
+    parlays = get_user_parlays(user_id, status="open")
+    if not parlays:
+        say("You have no open parlays!")
+        return
 
-        for parlay in parlays:
-            legs = (
-                json.loads(parlay["legs"])
-                if isinstance(parlay["legs"], str)
-                else parlay["legs"]
+    # Fetch live scores from all sports
+    all_games = fetch_all_scores(["nba", "nfl", "mlb", "nhl"])
+
+    # Lowercase each game's team names once, with their longer words; a leg
+    # matches a game if any of these appears in its pick
+    game_needles = []
+    for game in all_games:
+        home = game.home_team.lower()
+        away = game.away_team.lower()
+        needles = [home, away]
+        needles += [word for word in home.split() if len(word) > 3]
+        needles += [word for word in away.split() if len(word) > 3]
+        game_needles.append((game, tuple(dict.fromkeys(needles))))
+
+    lines = [f"*Live Parlay Status* ({len(all_games)} games tracked)\n"]
+
+    for parlay in parlays:
+        legs = (
+            json.loads(parlay["legs"])
+            if isinstance(parlay["legs"], str)
+            else parlay["legs"]
+        )
+        lines.append(f"*Parlay #{parlay['id']}* - {parlay['user_name']}")
+        if parlay["stake"]:
+            lines.append(
+                f"Stake: {parlay['stake']} → Potential: {parlay['potential_payout']}"
+            )
+        lines.append(f"Legs ({len(legs)}):")
+
+        for i, leg in enumerate(legs, 1):
+            pick = leg["pick"]
+            odds_str = (
+                f" ({leg.get('odds', '')})"
+                if leg.get("odds") and leg.get("odds") != 1.0
+                else ""
             )
-            lines.append(f"*Parlay #{parlay['id']}* - {parlay['user_name']}")
-            if parlay.get("stake"):
-                lines.append(
-                    f"Stake: {parlay['stake']} → Potential: {parlay['potential_payout']}"
-                )
-            lines.append(f"Legs ({len(legs)}):")
-
-            for i, leg in enumerate(legs, 1):
-                pick = leg["pick"]
-                odds_str = (
-                    f" ({leg.get('odds', '')})"
-                    if leg.get("odds") and leg.get("odds") != 1.0
-                    else ""
-                )
 
-                # Try to match to live game
-                live_info = ""
-                pick_lower = pick.lower()
-                for game in all_games:
-                    home = game.get("home_team", "").lower()
-                    away = game.get("away_team", "").lower()
-                    if (
-                        home in pick_lower
-                        or away in pick_lower
-                        or any(
-                            word in pick_lower for word in home.split() if len(word) > 3
-                        )
-                        or any(
-                            word in pick_lower for word in away.split() if len(word) > 3
-                        )
-                    ):
-                        score = f"{game.get('away_team', '')} {game.get('away_score', 0)} - {game.get('home_team', '')} {game.get('home_score', 0)}"
-                        status = game.get("status", "")
-                        live_info = f" → {score} ({status})"
-                        break
+            # Try to match to live game
+            live_info = ""
+            pick_lower = pick.lower()
+            for game, needles in game_needles:
+                if any(needle in pick_lower for needle in needles):
+                    score = (
+                        f"{game.away_team} {game.away_score} - "
+                        f"{game.home_team} {game.home_score}"
+                    )
+                    status = game.status
+                    live_info = f" → {score} ({status})"
+                    break
 
-                lines.append(f"  {i}. {pick}{odds_str}{live_info}")
+            lines.append(f"  {i}. {pick}{odds_str}{live_info}")
 
-            lines.append("")
+        lines.append("")
 
-        say("\n".join(lines))
-        return
+    say("\n".join(lines))
 
-    # Props command - show DARKO projections vs prop lines
-    if clean_text in ("props", "projections", "darko"):
-        say("Fetching prop lines and comparing to DARKO...")
 
-        data, error = compare_darko_to_props()
+def cmd_props(event, say, client):
+    """Show DARKO projections vs prop lines."""
+    say("Fetching prop lines and comparing to DARKO...")
 
-        if error:
-            say(error)
-            return
+    data, error = compare_darko_to_props()
+
+    if error:
+        say(error)
+        return
 
-        lines = ["*DARKO vs Prop Lines - Biggest Edges*\n"]
+    lines = ["*DARKO vs Prop Lines - Biggest Edges*\n"]
 
-        if data.get("last_updated"):
+    if data.get("last_updated"):
+        lines.append(
+            f"_DARKO data: {data['last_updated'].strftime('%Y-%m-%d %H:%M')}_\n"
+        )
+
+    if data.get("props_found") and data.get("edges_pts"):
+        lines.append("*POINTS - Biggest Deltas:*")
+        for e in data["edges_pts"][:8]:
+            delta_str = (
+                f"+{e['delta']:.1f}" if e["delta"] > 0 else f"{e['delta']:.1f}"
+            )
             lines.append(
-                f"_DARKO data: {data['last_updated'].strftime('%Y-%m-%d %H:%M')}_\n"
+                f"• {e['player']}: Line {e['line']} | DARKO {e['darko']:.1f} | *{e['edge']} ({delta_str})*"
             )
 
-        if data.get("props_found") and data.get("edges_pts"):
-            lines.append("*POINTS - Biggest Deltas:*")
-            for e in data["edges_pts"][:8]:
-                delta_str = (
-                    f"+{e['delta']:.1f}" if e["delta"] > 0 else f"{e['delta']:.1f}"
-                )
-                lines.append(
-                    f"• {e['player']}: Line {e['line']} | DARKO {e['darko']:.1f} | *{e['edge']} ({delta_str})*"
-                )
+        lines.append("\n*ASSISTS - Biggest Deltas:*")
+        for e in data["edges_ast"][:8]:
+            delta_str = (
+                f"+{e['delta']:.1f}" if e["delta"] > 0 else f"{e['delta']:.1f}"
+            )
+            lines.append(
+                f"• {e['player']}: Line {e['line']} | DARKO {e['darko']:.1f} | *{e['edge']} ({delta_str})*"
+            )
 
-            lines.append("\n*ASSISTS - Biggest Deltas:*")
-            for e in data["edges_ast"][:8]:
+        if data.get("edges_reb"):
+            lines.append("\n*REBOUNDS - Biggest Deltas:*")
+            for e in data["edges_reb"][:8]:
                 delta_str = (
                     f"+{e['delta']:.1f}" if e["delta"] > 0 else f"{e['delta']:.1f}"
                 )
@@ -2319,366 +2831,492 @@ _Tip: Upload DARKO CSV for prop projections!_""")
                     f"• {e['player']}: Line {e['line']} | DARKO {e['darko']:.1f} | *{e['edge']} ({delta_str})*"
                 )
 
-            if data.get("edges_reb"):
-                lines.append("\n*REBOUNDS - Biggest Deltas:*")
-                for e in data["edges_reb"][:8]:
-                    delta_str = (
-                        f"+{e['delta']:.1f}" if e["delta"] > 0 else f"{e['delta']:.1f}"
-                    )
-                    lines.append(
-                        f"• {e['player']}: Line {e['line']} | DARKO {e['darko']:.1f} | *{e['edge']} ({delta_str})*"
-                    )
+    elif data.get("top_pts"):
+        lines.append("_(No prop lines available - showing top projections)_\n")
+        lines.append("*Top Points Projections:*")
+        for i, p in enumerate(data["top_pts"][:10], 1):
+            lines.append(f"{i}. {p['name']} ({p['team']}) - {p['pts']:.1f} PTS")
 
-        elif data.get("top_pts"):
-            lines.append("_(No prop lines available - showing top projections)_\n")
-            lines.append("*Top Points Projections:*")
-            for i, p in enumerate(data["top_pts"][:10], 1):
-                lines.append(f"{i}. {p['name']} ({p['team']}) - {p['pts']:.1f} PTS")
+        lines.append("\n*Top Assists Projections:*")
+        for i, p in enumerate(data["top_ast"][:10], 1):
+            lines.append(f"{i}. {p['name']} ({p['team']}) - {p['ast']:.1f} AST")
+    else:
+        lines.append("No edges found. Make sure DARKO CSV is uploaded.")
 
-            lines.append("\n*Top Assists Projections:*")
-            for i, p in enumerate(data["top_ast"][:10], 1):
-                lines.append(f"{i}. {p['name']} ({p['team']}) - {p['ast']:.1f} AST")
-        else:
-            lines.append("No edges found. Make sure DARKO CSV is uploaded.")
+    lines.append("\n_Upload fresh DARKO CSV daily for best results_")
 
-        lines.append("\n_Upload fresh DARKO CSV daily for best results_")
+    say("\n".join(lines))
 
-        say("\n".join(lines))
-        return
 
-    # Injury command - show NBA injury report
-    if clean_text in ("injury", "injuries", "injury report"):
-        injuries = fetch_nba_injuries()
+def cmd_refresh(event, say, client):
+    """Forget cached sports and market data so the next command refetches it."""
+    clear_fetch_caches()
+    say("Cleared cached scores, lines, injuries and Kalshi markets.")
 
-        if not injuries:
-            say("Couldn't fetch injury report.")
-            return
 
-        # Group by status
-        out = [i for i in injuries if "out" in i["status"].lower()]
-        doubtful = [i for i in injuries if "doubtful" in i["status"].lower()]
-        questionable = [
-            i
-            for i in injuries
-            if "questionable" in i["status"].lower()
-            or "day-to-day" in i["status"].lower()
-        ]
-
-        lines = ["*NBA Injury Report*\n"]
-
-        if out:
-            lines.append("*OUT:*")
-            for i in out[:15]:
-                lines.append(f"• {i['player']} ({i['team']}) - {i['injury']}")
-
-        if doubtful:
-            lines.append("\n*DOUBTFUL:*")
-            for i in doubtful[:10]:
-                lines.append(f"• {i['player']} ({i['team']}) - {i['injury']}")
-
-        if questionable:
-            lines.append("\n*QUESTIONABLE/DTD:*")
-            for i in questionable[:15]:
-                lines.append(f"• {i['player']} ({i['team']}) - {i['injury']}")
-
-        say("\n".join(lines))
+def cmd_injuries(event, say, client):
+    """Show the NBA injury report."""
+    injuries = fetch_nba_injuries()
+
+    if not injuries:
+        say("Couldn't fetch injury report.")
         return
 
-    # Contract command - NBA player contract lookup
-    if clean_text.startswith("contract "):
-        player_name = clean_text[9:].strip()
-        if not player_name:
-            say("Usage: `contract <player name>`\nExample: `contract LeBron James`")
-            return
+    # Group by status (a report can fall in more than one group)
+    out, doubtful, questionable = [], [], []
+    for i in injuries:
+        status = i["status"].lower()
+        if "out" in status:
+            out.append(i)
+        if "doubtful" in status:
+            doubtful.append(i)
+        if "questionable" in status or "day-to-day" in status:
+            questionable.append(i)
+
+    lines = ["*NBA Injury Report*\n"]
+
+    if out:
+        lines.append("*OUT:*")
+        for i in out[:15]:
+            lines.append(f"• {i['player']} ({i['team']}) - {i['injury']}")
+
+    if doubtful:
+        lines.append("\n*DOUBTFUL:*")
+        for i in doubtful[:10]:
+            lines.append(f"• {i['player']} ({i['team']}) - {i['injury']}")
+
+    if questionable:
+        lines.append("\n*QUESTIONABLE/DTD:*")
+        for i in questionable[:15]:
+            lines.append(f"• {i['player']} ({i['team']}) - {i['injury']}")
+
+    say("\n".join(lines))
+
+
+def cmd_contract(match, event, say, client):
+    """Look up an NBA player contract."""
+    player_name = match.group(1).strip()
+    if not player_name:
+        say("Usage: `contract <player name>`\nExample: `contract LeBron James`")
+        return
 
-        say(f"Looking up contract for {player_name}...")
-        contract = fetch_nba_contract(player_name)
+    say(f"Looking up contract for {player_name}...")
+    contract = fetch_nba_contract(player_name)
 
-        if contract:
-            say(format_contract(contract))
-        else:
-            say(f"Couldn't find contract info for *{player_name}*. Try the full name (e.g., 'LeBron James' not 'LeBron').")
+    if contract:
+        say(format_contract(contract))
+    else:
+        say(f"Couldn't find contract info for *{player_name}*. Try the full name (e.g., 'LeBron James' not 'LeBron').")
+
+
+def cmd_settle(settle, event, say, client):
+    """Settle a bet in favour of the winner."""
+    bet_id, winner_id = settle
+    bet = get_bet(bet_id)
+
+    if not bet:
+        say(f"Bet #{bet_id} not found!")
+        return
+    if bet["status"] != "open":
+        say(f"Bet #{bet_id} is already {bet['status']}!")
+        return
+    if winner_id not in (bet["person1_id"], bet["person2_id"]):
+        say(f"Winner must be one of the people in the bet!")
         return
 
-    # Settle command - flexible parsing
-    # Use original text (not lowercased) to preserve user ID case
-    text_no_bot = re.sub(f"<@{bot_user_id}>", "", text).strip()
-
-    # Try multiple patterns for settling
-    settle_patterns = [
-        r"settle\s+(\d+)\s+(?:winner\s+)?<@(\w+)>",  # settle 1 winner @person
-        r"settle\s+(\d+)\s+<@(\w+)>",  # settle 1 @person
-        r"(\d+)\s+(?:winner|won|goes to)\s+<@(\w+)>",  # 1 winner @person
-        r"<@(\w+)>\s+(?:won|wins)\s+(?:bet\s+)?(\d+)",  # @person won bet 1
-        r"(?:close|resolve|end)\s+(\d+)\s+<@(\w+)>",  # close 1 @person
-        r"(\d+)\s+<@(\w+)>\s+(?:won|wins)",  # 1 @person won
-        r"(\d+)\s+to\s+<@(\w+)>",  # 1 to @person
-    ]
+    winner_name = get_user_name(client, winner_id)
+    settle_bet(bet_id, winner_id, winner_name)
 
-    settle_match = None
-    bet_id = None
-    winner_id = None
+    loser_id = (
+        bet["person2_id"] if winner_id == bet["person1_id"] else bet["person1_id"]
+    )
+    say(
+        f"Bet #{bet_id} settled! <@{winner_id}> wins {bet['amount']} from <@{loser_id}>!"
+    )
 
-    for pattern in settle_patterns:
-        match = re.search(pattern, text_no_bot, re.IGNORECASE)
-        if match:
-            groups = match.groups()
-            # Figure out which group is the number and which is the user
-            if groups[0].isdigit():
-                bet_id = int(groups[0])
-                winner_id = groups[1]
-            else:
-                winner_id = groups[0]
-                bet_id = int(groups[1])
-            settle_match = match
-            break
 
-    if settle_match:
-        bet = get_bet(bet_id)
+def cmd_cancel(match, event, say, client):
+    """Cancel an open bet."""
+    bet_id = int(match.group(1))
+    if cancel_bet(bet_id):
+        say(f"Bet #{bet_id} cancelled!")
+    else:
+        say(f"Couldn't cancel bet #{bet_id} (not found or already resolved)")
+
+
+# Settle phrasings, in priority order. Each names its bet number "bet" and the
+# winner's user ID "user". Matched against lowercased text (no re.IGNORECASE);
+# user IDs are sliced out of the original text by span, since Slack IDs are
+# uppercase
+SETTLE_PATTERNS = tuple(
+    re.compile(pattern)
+    for pattern in (
+        # settle 1 winner @person
+        r"settle\s+(?P<bet>\d+)\s+(?:winner\s+)?<@(?P<user>\w+)>",
+        # settle 1 @person
+        r"settle\s+(?P<bet>\d+)\s+<@(?P<user>\w+)>",
+        # 1 winner @person
+        r"(?P<bet>\d+)\s+(?:winner|won|goes to)\s+<@(?P<user>\w+)>",
+        # @person won bet 1
+        r"<@(?P<user>\w+)>\s+(?:won|wins)\s+(?:bet\s+)?(?P<bet>\d+)",
+        # close 1 @person
+        r"(?:close|resolve|end)\s+(?P<bet>\d+)\s+<@(?P<user>\w+)>",
+        # 1 @person won
+        r"(?P<bet>\d+)\s+<@(?P<user>\w+)>\s+(?:won|wins)",
+        # 1 to @person
+        r"(?P<bet>\d+)\s+to\s+<@(?P<user>\w+)>",
+    )
+)
 
-        if not bet:
-            say(f"Bet #{bet_id} not found!")
-            return
-        if bet["status"] != "open":
-            say(f"Bet #{bet_id} is already {bet['status']}!")
-            return
-        if winner_id not in (bet["person1_id"], bet["person2_id"]):
-            say(f"Winner must be one of the people in the bet!")
-            return
 
-        winner_name = get_user_name(client, winner_id)
-        settle_bet(bet_id, winner_id, winner_name)
+_ASCII_LOWER = str.maketrans(
+    "ABCDEFGHIJKLMNOPQRSTUVWXYZ", "abcdefghijklmnopqrstuvwxyz"
+)
 
-        loser_id = (
-            bet["person2_id"] if winner_id == bet["person1_id"] else bet["person1_id"]
-        )
-        say(
-            f"Bet #{bet_id} settled! <@{winner_id}> wins {bet['amount']} from <@{loser_id}>!"
-        )
-        return
 
-    # Cancel command
-    cancel_match = re.match(r"cancel\s+(\d+)", clean_text)
-    if cancel_match:
-        bet_id = int(cancel_match.group(1))
-        if cancel_bet(bet_id):
-            say(f"Bet #{bet_id} cancelled!")
-        else:
-            say(f"Couldn't cancel bet #{bet_id} (not found or already resolved)")
-        return
+# Every settle phrasing in one alternation, so a message that isn't a settle
+# command is scanned once instead of 7 times. Pattern i is wrapped in group
+# "p<i>" with its groups renamed "bet<i>"/"user<i>" (names must be unique).
+_SETTLE_ANY_RE = re.compile(
+    "|".join(
+        f"(?P<p{i}>" + re.sub(r"\(\?P<(bet|user)>", rf"(?P<\g<1>{i}>", p.pattern) + ")"
+        for i, p in enumerate(SETTLE_PATTERNS)
+    )
+)
 
-    # Try to parse as a new bet
-    bet_data = parse_bet_message(text, bot_user_id, user_id)
-    if bet_data:
-        person1_name = get_user_name(client, bet_data["person1_id"])
-        person2_name = get_user_name(client, bet_data["person2_id"])
 
-        bet_id = add_bet(
-            channel_id=channel_id,
-            person1_id=bet_data["person1_id"],
-            person1_name=person1_name,
-            person2_id=bet_data["person2_id"],
-            person2_name=person2_name,
-            amount=bet_data["amount"],
-            description=bet_data["description"],
-            created_by=user_id,
-        )
+def match_settle_command(text, text_lower=None):
+    """Find a settle command in the text. Returns (bet_id, winner_id) or None.
 
-        say(
-            f"Bet #{bet_id} recorded! <@{bet_data['person1_id']}> vs <@{bet_data['person2_id']}> "
-            f"for {bet_data['amount']}: {bet_data['description']}"
-        )
-        return
+    text_lower is text.lower() if the caller already has it. Earlier
+    SETTLE_PATTERNS take priority, exactly as if tried one by one.
+    """
+    if text_lower is None or len(text_lower) != len(text):
+        # str.lower() lengthens a few non-ASCII characters, which would throw
+        # the spans off; folding ASCII only keeps them aligned with text
+        text_lower = text.translate(_ASCII_LOWER)
 
-    # Didn't understand
-    say("I didn't understand that. Try `@betbot help` for usage info.")
+    # Fast path for the usual "settle 1 [winner] @person" at the start; the
+    # first pattern has top priority, so a match here is always the answer
+    match = SETTLE_PATTERNS[0].match(text_lower)
+    if match:
+        return int(match["bet"]), text[match.start("user") : match.end("user")]
+
+    match = _SETTLE_ANY_RE.search(text_lower)
+    if not match:
+        return None
+
+    # The alternation finds the leftmost match; a higher-priority pattern can
+    # only win by matching further along, so check those from there
+    index = int(match.lastgroup[1:])
+    for pattern in SETTLE_PATTERNS[:index]:
+        later = pattern.search(text_lower, match.start() + 1)
+        if later:
+            return int(later["bet"]), text[later.start("user") : later.end("user")]
+
+    user = f"user{index}"
+    return int(match[f"bet{index}"]), text[match.start(user) : match.end(user)]
+
+
+# Exact-match commands: alias -> handler(event, say, client)
+COMMANDS = {
+    alias: handler
+    for aliases, handler in [
+        (("commands", "command", "cmds", "cmd"), cmd_commands),
+        (("help",), cmd_help),
+        (("list", "bets", "open", "openbets", "open bets"), cmd_list),
+        (("listall", "list all", "all", "all bets", "allbets"), cmd_list_all),
+        (("history", "recent", "resolved", "past", "past bets"), cmd_history),
+        (("balance", "mybalance", "my balance"), cmd_balance),
+        (("balances", "leaderboard", "standings", "all balances"), cmd_balances),
+        (("mybets", "my bets", "myopen", "my open"), cmd_mybets),
+        (("myhistory", "my history"), cmd_myhistory),
+        (("shame", "wall of shame", "wallofshame", "losers", "worst"), cmd_shame),
+        (("parlay", "parlays", "myparlay", "myparlays", "my parlays"), cmd_parlays),
+        (("parlay history", "parlays history", "parlay all"), cmd_parlay_history),
+        (("check",), cmd_check),
+        (
+            ("check parlays", "parlay check", "check parlay", "parlays check"),
+            cmd_check_parlays,
+        ),
+        (("props", "projections", "darko"), cmd_props),
+        (("injury", "injuries", "injury report"), cmd_injuries),
+        (("refresh", "refresh data", "clear cache"), cmd_refresh),
+    ]
+    for alias in aliases
+}
+
+# Parameterized commands by first word, tried in order if no exact match:
+# first word -> [(matcher, handler(match, event, say, client), match original case)]
+PREFIX_COMMANDS = {
+    word: candidates
+    for words, candidates in [
+        (
+            ("parlay",),
+            [
+                (_PARLAY_ADD_RE.match, cmd_parlay_add, False),
+                (_PARLAY_MULTILINE_RE.match, cmd_parlay_multiline, True),
+                (_PARLAY_RESULT_RE.match, cmd_parlay_result, False),
+            ],
+        ),
+        (("score", "scores"), [(_SCORES_RE.match, cmd_scores, False)]),
+        (
+            ("line", "lines", "odds", "spread", "spreads", "betting"),
+            [(_LINES_RE.match, cmd_lines, False)],
+        ),
+        (
+            ("kalshi", "predict", "prediction", "market", "markets"),
+            [(_KALSHI_RE.match, cmd_kalshi, False)],
+        ),
+        (("contract",), [(_CONTRACT_RE.match, cmd_contract, False)]),
+        (("cancel",), [(_CANCEL_RE.match, cmd_cancel, False)]),
+    ]
+    for word in words
+}
+
+
+# Known team names on betting slips (partial matches OK)
+_SLIP_TEAMS = (
+    # NBA
+    "lakers",
+    "celtics",
+    "warriors",
+    "bulls",
+    "heat",
+    "nets",
+    "knicks",
+    "sixers",
+    "bucks",
+    "suns",
+    "mavericks",
+    "mavs",
+    "clippers",
+    "nuggets",
+    "grizzlies",
+    "cavaliers",
+    "cavs",
+    "thunder",
+    "pelicans",
+    "timberwolves",
+    "wolves",
+    "kings",
+    "hawks",
+    "hornets",
+    "magic",
+    "pacers",
+    "pistons",
+    "raptors",
+    "wizards",
+    "spurs",
+    "jazz",
+    "trail blazers",
+    "blazers",
+    "rockets",
+    # NFL
+    "chiefs",
+    "eagles",
+    "cowboys",
+    "bills",
+    "ravens",
+    "49ers",
+    "niners",
+    "dolphins",
+    "lions",
+    "packers",
+    "bengals",
+    "chargers",
+    "seahawks",
+    "steelers",
+    "rams",
+    "vikings",
+    "jaguars",
+    "jags",
+    "texans",
+    "colts",
+    "broncos",
+    "raiders",
+    "saints",
+    "patriots",
+    "pats",
+    "bears",
+    "falcons",
+    "cardinals",
+    "giants",
+    "jets",
+    "titans",
+    "panthers",
+    "browns",
+    "commanders",
+    "buccaneers",
+    "bucs",
+    # MLB
+    "yankees",
+    "dodgers",
+    "braves",
+    "astros",
+    "mets",
+    "phillies",
+    "padres",
+    "mariners",
+    "blue jays",
+    "orioles",
+    "rays",
+    "twins",
+    "guardians",
+    "rangers",
+    "red sox",
+    "white sox",
+    "cubs",
+    "brewers",
+    "cardinals",
+    "diamondbacks",
+    "dbacks",
+    "giants",
+    "reds",
+    "pirates",
+    "royals",
+    "tigers",
+    "athletics",
+    "angels",
+    "rockies",
+    "marlins",
+    "nationals",
+    # NHL
+    "bruins",
+    "avalanche",
+    "panthers",
+    "oilers",
+    "rangers",
+    "hurricanes",
+    "devils",
+    "maple leafs",
+    "leafs",
+    "lightning",
+    "stars",
+    "jets",
+    "wild",
+    "golden knights",
+    "knights",
+    "flames",
+    "kraken",
+    "penguins",
+    "pens",
+    "capitals",
+    "caps",
+    "canucks",
+    "islanders",
+    "isles",
+    "kings",
+    "blackhawks",
+    "hawks",
+    "blues",
+    "senators",
+    "sens",
+    "sabres",
+    "red wings",
+    "wings",
+    "ducks",
+    "coyotes",
+    "predators",
+    "preds",
+    "sharks",
+    # Soccer
+    "arsenal",
+    "chelsea",
+    "liverpool",
+    "man city",
+    "manchester city",
+    "man united",
+    "manchester united",
+    "tottenham",
+    "spurs",
+    "barcelona",
+    "real madrid",
+    "bayern",
+    "psg",
+    "juventus",
+    "inter",
+    "milan",
+    "dortmund",
+    "ajax",
+    "benfica",
+    "porto",
+)
+
+# Team text is known if it is one of _SLIP_TEAMS (a set lookup, the usual
+# case), contains one (one search of the alternation) or is part of one (a
+# substring of the NUL-joined names)
+_SLIP_TEAM_SET = frozenset(_SLIP_TEAMS)
+_SLIP_TEAM_RE = re.compile("|".join(map(re.escape, _SLIP_TEAMS)))
+_SLIP_TEAMS_JOINED = "\0".join(_SLIP_TEAMS)
+
+
+def _is_slip_team(name):
+    """Whether lowercased team text contains, or is part of, a known team."""
+    return (
+        name in _SLIP_TEAM_SET
+        or name in _SLIP_TEAMS_JOINED
+        or _SLIP_TEAM_RE.search(name) is not None
+    )
+
+
+# Betting slip lines: team + spread/ML/total with optional odds, and bare totals
+_SLIP_BET_RE = re.compile(
+    r"([A-Za-z][A-Za-z\s\.\']+?)\s*+"
+    r"([+-]?\d+\.?\d*|ML|ml|moneyline|over|under|o\d+\.?\d*|u\d+\.?\d*)"
+    r"\s*([+-]\d{2,3})?",
+    re.IGNORECASE,
+)
+_SLIP_TOTAL_RE = re.compile(
+    r"(over|under|o|u)\s*+(\d+\.?\d*)\s*([+-]\d{2,3})?", re.IGNORECASE
+)
+# Either of the above, so a line matching neither costs a single scan
+_SLIP_LINE_RE = re.compile(
+    f"(?P<bet>{_SLIP_BET_RE.pattern})|(?P<total>{_SLIP_TOTAL_RE.pattern})",
+    re.IGNORECASE,
+)
+# OCR lines are cut to this length before matching. A slip leg is far shorter,
+# and the lazy team-name group makes a search superlinear in line length, so
+# the cap bounds the work a garbled line can cost.
+SLIP_LINE_MAX = 200
 
 
 def parse_betting_slip_ocr(ocr_text_lines):
     """Parse OCR text from a betting slip. Focuses on team names + lines."""
     legs = []
-
-    # Known team names (partial matches OK)
-    teams = [
-        # NBA
-        "lakers",
-        "celtics",
-        "warriors",
-        "bulls",
-        "heat",
-        "nets",
-        "knicks",
-        "sixers",
-        "bucks",
-        "suns",
-        "mavericks",
-        "mavs",
-        "clippers",
-        "nuggets",
-        "grizzlies",
-        "cavaliers",
-        "cavs",
-        "thunder",
-        "pelicans",
-        "timberwolves",
-        "wolves",
-        "kings",
-        "hawks",
-        "hornets",
-        "magic",
-        "pacers",
-        "pistons",
-        "raptors",
-        "wizards",
-        "spurs",
-        "jazz",
-        "trail blazers",
-        "blazers",
-        "rockets",
-        # NFL
-        "chiefs",
-        "eagles",
-        "cowboys",
-        "bills",
-        "ravens",
-        "49ers",
-        "niners",
-        "dolphins",
-        "lions",
-        "packers",
-        "bengals",
-        "chargers",
-        "seahawks",
-        "steelers",
-        "rams",
-        "vikings",
-        "jaguars",
-        "jags",
-        "texans",
-        "colts",
-        "broncos",
-        "raiders",
-        "saints",
-        "patriots",
-        "pats",
-        "bears",
-        "falcons",
-        "cardinals",
-        "giants",
-        "jets",
-        "titans",
-        "panthers",
-        "browns",
-        "commanders",
-        "buccaneers",
-        "bucs",
-        # MLB
-        "yankees",
-        "dodgers",
-        "braves",
-        "astros",
-        "mets",
-        "phillies",
-        "padres",
-        "mariners",
-        "blue jays",
-        "orioles",
-        "rays",
-        "twins",
-        "guardians",
-        "rangers",
-        "red sox",
-        "white sox",
-        "cubs",
-        "brewers",
-        "cardinals",
-        "diamondbacks",
-        "dbacks",
-        "giants",
-        "reds",
-        "pirates",
-        "royals",
-        "tigers",
-        "athletics",
-        "angels",
-        "rockies",
-        "marlins",
-        "nationals",
-        # NHL
-        "bruins",
-        "avalanche",
-        "panthers",
-        "oilers",
-        "rangers",
-        "hurricanes",
-        "devils",
-        "maple leafs",
-        "leafs",
-        "lightning",
-        "stars",
-        "jets",
-        "wild",
-        "golden knights",
-        "knights",
-        "flames",
-        "kraken",
-        "penguins",
-        "pens",
-        "capitals",
-        "caps",
-        "canucks",
-        "islanders",
-        "isles",
-        "kings",
-        "blackhawks",
-        "hawks",
-        "blues",
-        "senators",
-        "sens",
-        "sabres",
-        "red wings",
-        "wings",
-        "ducks",
-        "coyotes",
-        "predators",
-        "preds",
-        "sharks",
-        # Soccer
-        "arsenal",
-        "chelsea",
-        "liverpool",
-        "man city",
-        "manchester city",
-        "man united",
-        "manchester united",
-        "tottenham",
-        "spurs",
-        "barcelona",
-        "real madrid",
-        "bayern",
-        "psg",
-        "juventus",
-        "inter",
-        "milan",
-        "dortmund",
-        "ajax",
-        "benfica",
-        "porto",
-    ]
+    # Lowercased picks so far, NUL-separated: a new leg is a duplicate if its
+    # key is part of any earlier pick
+    seen_picks = ""
 
     for line in ocr_text_lines:
-        line = line.strip()
+        line = line.strip()[:SLIP_LINE_MAX]
         if len(line) < 3:
             continue
 
         line_lower = line.lower()
 
+        # Every slip leg has a digit or one of these words, so lines with
+        # neither can skip the regexes
+        if not (
+            "over" in line_lower
+            or "under" in line_lower
+            or "ml" in line_lower
+            or "money" in line_lower
+            or any(map(str.isdecimal, line_lower))
+        ):
+            continue
+
         # Look for team name + line pattern (e.g., "Lakers +3", "Chiefs -7.5", "Celtics ML")
-        bet_pattern = re.search(
-            r"([A-Za-z][A-Za-z\s\.\']+?)\s*([+-]?\d+\.?\d*|ML|ml|moneyline|over|under|o\d+\.?\d*|u\d+\.?\d*)\s*([+-]\d{2,3})?",
-            line,
-            re.IGNORECASE,
-        )
+        # Neither pattern matches before the leftmost match of either, so
+        # the individual searches can start there
+        either = _SLIP_LINE_RE.search(line)
+        if not either:
+            continue
+        start = either.start()
+        if either.lastgroup == "bet":
+            bet_pattern = _SLIP_BET_RE.match(line, start)
+        else:
+            bet_pattern = _SLIP_BET_RE.search(line, start + 1)
 
         if bet_pattern:
             potential_team = bet_pattern.group(1).strip().lower()
@@ -2687,24 +3325,21 @@ def parse_betting_slip_ocr(ocr_text_lines):
 
             # Check if this matches a known team
             team_match = None
-            for team in teams:
-                if team in potential_team or potential_team in team:
-                    team_match = potential_team.title()
-                    break
+            if _is_slip_team(potential_team):
+                team_match = potential_team.title()
 
             if team_match:
                 pick = f"{team_match} {line_info}"
                 odds_val = parse_odds(odds) if odds else 1.0
 
                 # Avoid duplicates
-                if not any(team_match.lower() in leg["pick"].lower() for leg in legs):
+                if team_match.lower() not in seen_picks:
                     legs.append({"pick": pick, "odds": odds_val})
+                    seen_picks += "\0" + pick.lower()
                 continue
 
         # Also check for over/under totals (e.g., "Over 220.5", "Under 45")
-        total_pattern = re.search(
-            r"(over|under|o|u)\s*(\d+\.?\d*)\s*([+-]\d{2,3})?", line, re.IGNORECASE
-        )
+        total_pattern = _SLIP_TOTAL_RE.search(line, start)
 
         if total_pattern:
             ou_type = total_pattern.group(1).upper()
@@ -2717,71 +3352,80 @@ def parse_betting_slip_ocr(ocr_text_lines):
             odds_val = parse_odds(odds) if odds else 1.0
 
             # Avoid duplicates
-            if not any(pick.lower() in leg["pick"].lower() for leg in legs):
+            pick_lower = pick.lower()
+            if pick_lower not in seen_picks:
                 legs.append({"pick": pick, "odds": odds_val})
+                seen_picks += "\0" + pick_lower
 
     return legs
 
 
-@app.event("message")
+def _is_csv_file(file_info):
+    """Whether an uploaded Slack file is a CSV."""
+    return (
+        file_info.get("name", "").lower().endswith(".csv")
+        or file_info.get("mimetype") == "text/csv"
+    )
+
+
+def _is_image_file(file_info):
+    """Whether an uploaded Slack file is an image."""
+    return file_info.get("mimetype", "").startswith("image/")
+
+
+# Only file uploads need work; Bolt runs the first listener that matches, so
+# every other message falls through to ignore_message below
+@app.event({"type": "message", "subtype": "file_share"})
 def handle_message(event, say, client):
-    """Handle regular messages, including file uploads."""
-    # Check if this message has files
+    """Handle file uploads (DARKO CSVs, betting slip screenshots)."""
     files = event.get("files", [])
-    text = event.get("text", "")
-    user_id = event.get("user")
-    channel_id = event.get("channel")
-    subtype = event.get("subtype")
+    if not files:
+        return
 
-    # Log for debugging
-    if files:
-        logger.info(
-            f"Message with files received: {len(files)} files, text: {text[:50] if text else 'none'}"
-        )
+    csv_files = [file_info for file_info in files if _is_csv_file(file_info)]
+    image_files = [file_info for file_info in files if _is_image_file(file_info)]
 
-    # Skip bot messages and message_changed events
-    if subtype in ("bot_message", "message_changed", "message_deleted"):
+    if not csv_files and not image_files:
         return
 
-    if not files:
-        return
+    text = event.get("text", "")
+    user_id = event.get("user")
 
-    # Any image upload we'll try to process as a betting slip
-    # User can include stake in message like "$20" or "parlay $50"
+    # Log for debugging
+    logger.info(
+        f"Message with files received: {len(files)} files, text: {text[:50] if text else 'none'}"
+    )
     logger.info(f"Processing file upload from {user_id}")
 
-    # Look for stake amount in the message
-    stake_match = re.search(r"\$(\d+(?:\.\d{2})?)", text)
-    stake = stake_match.group(1) if stake_match else "10"
-
     # Process CSV files (DARKO projections)
-    for file_info in files:
-        file_name = file_info.get("name", "")
-        if (
-            file_name.lower().endswith(".csv")
-            or file_info.get("mimetype") == "text/csv"
-        ):
-            try:
-                file_url = file_info.get("url_private_download") or file_info.get(
-                    "url_private"
-                )
-                if not file_url:
-                    continue
-
-                headers = {
-                    "Authorization": f"Bearer {os.environ.get('SLACK_BOT_TOKEN')}"
-                }
-                resp = requests.get(file_url, headers=headers, timeout=30)
+    for file_info in csv_files:
+        try:
+            file_url = file_info.get("url_private_download") or file_info.get(
+                "url_private"
+            )
+            if not file_url:
+                continue
 
+            headers = {
+                "Authorization": f"Bearer {os.environ.get('SLACK_BOT_TOKEN')}"
+            }
+            with _session.get(
+                file_url, headers=headers, timeout=30, stream=True
+            ) as resp:
                 if resp.status_code != 200:
                     say("Couldn't download the CSV file.")
                     continue
 
-                csv_content = resp.content.decode("utf-8")
+                # Decode the download as the CSV parser reads it, rather than
+                # holding the whole file as bytes and again as text
+                resp.raw.decode_content = True
+                csv_stream = io.TextIOWrapper(resp.raw, encoding="utf-8", newline="")
+                header = csv_stream.readline()
 
-                # Check if it looks like DARKO data
-                if "Player" in csv_content and "PTS" in csv_content:
-                    count = parse_darko_csv(csv_content)
+                # Check if it looks like DARKO data (the columns are named in
+                # the header)
+                if "Player" in header and "PTS" in header:
+                    count = parse_darko_csv(itertools.chain([header], csv_stream))
                     say(
                         f"✅ DARKO projections loaded!\n"
                         f"Parsed {count} players.\n\n"
@@ -2792,21 +3436,25 @@ def handle_message(event, say, client):
                         "This doesn't look like DARKO data. "
                         "Expected columns: Player, Team, PTS, AST, etc."
                     )
-                return
+            return
 
-            except Exception as e:
-                logger.error(f"Error processing CSV: {e}")
-                say("Error processing CSV file.")
-                return
+        except Exception as e:
+            logger.error(f"Error processing CSV: {e}")
+            say("Error processing CSV file.")
+            return
 
     # Image/screenshot OCR is disabled - tell users to type parlays manually
-    for file_info in files:
-        if file_info.get("mimetype", "").startswith("image/"):
-            say(
-                "Screenshot reading is currently disabled. Please type out your parlay:\n"
-                "`@betbot parlay $50`\n```\nPick1 +odds\nPick2 -odds\n```"
-            )
-            return
+    if image_files:
+        say(
+            "Screenshot reading is currently disabled. Please type out your parlay:\n"
+            "`@betbot parlay $50`\n```\nPick1 +odds\nPick2 -odds\n```"
+        )
+
+
+@app.event("message")
+def ignore_message():
+    """Acknowledge all other channel messages without doing anything."""
+    pass
 
 
 @app.event("file_shared")
@@ -2815,6 +3463,22 @@ def handle_file_shared(event, logger):
     pass
 
 
+@app.event("user_change")
+def handle_user_change(event):
+    """Refresh a cached display name when a user edits their profile."""
+    user = event.get("user", {})
+    user_id = user.get("id")
+    if user_id:
+        name = user.get("real_name") or user.get("name") or user_id
+        _cache_user_name(user_id, name)
+
+
+@app.event("team_join")
+def handle_team_join(event):
+    """Cache a new member's display name (the event carries the same user)."""
+    handle_user_change(event)
+
+
 def main():
     """Main entry point."""
     bot_token = os.environ.get("SLACK_BOT_TOKEN")
@@ -2832,6 +3496,12 @@ def main():
 
     init_db()
     logger.info("Database initialized")
+    if load_darko_projections():
+        logger.info("Loaded saved DARKO projections")
+
+    get_bot_user_id(app.client)
+    # Warm the name cache in the background so startup isn't held up
+    _io_pool.submit(prefetch_users, app.client)
 
     print("Bet Tracker bot starting...")
     handler = SocketModeHandler(app, app_token)
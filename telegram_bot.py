@@ -25,10 +25,15 @@ Or just upload a screenshot of your betting slip!
 import os
 import re
 import io
+import asyncio
+import multiprocessing
 import sqlite3
 import logging
+import threading
 import json
 import requests
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime
 from telegram import Update
 from telegram.ext import (
@@ -49,24 +54,115 @@ logger = logging.getLogger(__name__)
 # Database
 DATABASE = "/data/telegram-bets.db" if os.path.isdir("/data") else "telegram-bets.db"
 
-# Lazy load OCR
+# Shared connection (opened once, reused by every helper)
+_db_conn = None
+_db_lock = threading.Lock()
+
+
+def get_db():
+    """Get or open the shared database connection."""
+    global _db_conn
+    if _db_conn is None:
+        # Autocommit mode: each statement commits on its own under WAL
+        conn = sqlite3.connect(
+            DATABASE, check_same_thread=False, isolation_level=None
+        )
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA cache_size=-64000")
+        conn.execute("PRAGMA mmap_size=268435456")
+        conn.execute("PRAGMA busy_timeout=5000")
+        _db_conn = conn
+    return _db_conn
+
+
+# Lazy load OCR (only ever inside the OCR worker process)
 _ocr_reader = None
 
+# Torch threads for the OCR worker; by default leave a core for the bot process
+OCR_TORCH_THREADS = int(
+    os.environ.get("OCR_TORCH_THREADS", max(1, (os.cpu_count() or 2) - 1))
+)
+
 
 def get_ocr_reader():
     """Get or initialize the OCR reader."""
     global _ocr_reader
     if _ocr_reader is None:
         import easyocr
+        import torch
 
-        _ocr_reader = easyocr.Reader(["en"], gpu=False)
+        torch.set_num_threads(OCR_TORCH_THREADS)
+        _ocr_reader = easyocr.Reader(["en"], gpu=False, quantize=True)
     return _ocr_reader
 
 
+# readtext() settings. Slips are large, clean screenshots, so detection runs
+# unmagnified on a canvas capped at 1600px (EasyOCR's default is 2560), which
+# roughly halves detection time for big images with little accuracy cost. A
+# slip has many short text boxes; recognizing them 8 at a time amortizes the
+# per-call model overhead.
+OCR_READTEXT_OPTIONS = {"mag_ratio": 1.0, "canvas_size": 1600, "batch_size": 8}
+
+
+def ocr_readtext(image_bytes):
+    """Run OCR on an image's encoded bytes. Returns (text, confidence) pairs."""
+    # EasyOCR only decodes bytes (not bytearray); convert here in the worker
+    # so the bot process never holds a second copy of the download
+    image_bytes = bytes(image_bytes)
+    results = get_ocr_reader().readtext(image_bytes, **OCR_READTEXT_OPTIONS)
+    return [(text, conf) for _, text, conf in results]
+
+
+def warm_ocr_reader():
+    """Load the OCR model in the worker; submitted at startup so the first
+    screenshot doesn't wait for it."""
+    get_ocr_reader()
+
+
+def _log_ocr_warmup(pool, future):
+    """Report whether the OCR worker loaded its model."""
+    error = future.exception()
+    if error:
+        logger.warning(f"OCR warmup failed: {error}")
+        if isinstance(error, BrokenProcessPool):
+            reset_ocr_pool(pool)
+    else:
+        logger.info("OCR reader warmed")
+
+
+# OCR runs in one worker process that keeps the model loaded, so recognizing a
+# screenshot doesn't block the bot's event loop or compete with it for the GIL.
+# The model loads on the worker's first task, so a load error fails only that
+# task instead of breaking the pool.
+_ocr_pool = None
+
+
+def get_ocr_pool():
+    """Get or start the OCR worker process."""
+    global _ocr_pool
+    if _ocr_pool is None:
+        _ocr_pool = ProcessPoolExecutor(
+            max_workers=1, mp_context=multiprocessing.get_context("spawn")
+        )
+    return _ocr_pool
+
+
+def reset_ocr_pool(pool):
+    """Drop a broken OCR pool (e.g. its worker was killed) so the next call
+    to get_ocr_pool() starts a fresh worker."""
+    global _ocr_pool
+    pool.shutdown(wait=False, cancel_futures=True)
+    # Another task may already have replaced it
+    if _ocr_pool is pool:
+        _ocr_pool = None
+
+
 def init_db():
     """Initialize the database."""
-    conn = sqlite3.connect(DATABASE)
-    c = conn.cursor()
+    c = get_db().cursor()
     c.execute("""
         CREATE TABLE IF NOT EXISTS bets (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -101,8 +197,6 @@ def init_db():
             source TEXT
         )
     """)
-    conn.commit()
-    conn.close()
 
 
 def parse_odds(odds_str):
@@ -127,6 +221,25 @@ def parse_odds(odds_str):
     return 1.0
 
 
+# Leg prefixes stripped in order: "1. " or "1) ", "- " or "• " or "* ", "Leg 1:"
+_LEG_PREFIX_RES = (
+    re.compile(r"^[\d]+[.\)]\s*"),
+    re.compile(r"^[-•*]\s*"),
+    re.compile(r"^leg\s*\d*:?\s*", re.IGNORECASE),
+)
+
+# Odds at the end of a leg, tried in order
+_LEG_ODDS_RES = (
+    re.compile(r"([+-]\d{3})\s*$"),  # American odds: +150, -110
+    re.compile(r"([+-]\d+)\s*$"),  # Shorter American: +15, -11
+    re.compile(r"@\s*([+-]?\d+\.?\d*)\s*$"),  # @ 1.95
+    re.compile(r"\(([+-]?\d+\.?\d*)\)\s*$"),  # (1.95) or (+150)
+    re.compile(r"\s(\d+\.\d{2})\s*$"),  # Decimal: 1.95
+)
+
+_TRAILING_PUNCT_RE = re.compile(r"[,;:]+$")
+
+
 def parse_parlay_text(text):
     """Parse parlay legs from text input. Very forgiving parser."""
     legs = []
@@ -156,9 +269,8 @@ def parse_parlay_text(text):
             continue
 
         # Remove common prefixes: numbers, bullets, dashes
-        line = re.sub(r"^[\d]+[.\)]\s*", "", line)  # "1. " or "1) "
-        line = re.sub(r"^[-•*]\s*", "", line)  # "- " or "• " or "* "
-        line = re.sub(r"^leg\s*\d*:?\s*", "", line, flags=re.IGNORECASE)  # "Leg 1:" etc
+        for prefix in _LEG_PREFIX_RES:
+            line = prefix.sub("", line)
 
         line = line.strip()
         if not line:
@@ -172,16 +284,8 @@ def parse_parlay_text(text):
         leg = {"pick": line, "odds": 1.0}
 
         # Try to extract odds from various formats
-        odds_patterns = [
-            r"([+-]\d{3})\s*$",  # American odds: +150, -110
-            r"([+-]\d+)\s*$",  # Shorter American: +15, -11
-            r"@\s*([+-]?\d+\.?\d*)\s*$",  # @ 1.95
-            r"\(([+-]?\d+\.?\d*)\)\s*$",  # (1.95) or (+150)
-            r"\s(\d+\.\d{2})\s*$",  # Decimal: 1.95
-        ]
-
-        for pattern in odds_patterns:
-            match = re.search(pattern, line)
+        for pattern in _LEG_ODDS_RES:
+            match = pattern.search(line)
             if match:
                 odds_str = match.group(1)
                 leg["odds"] = parse_odds(odds_str)
@@ -192,7 +296,7 @@ def parse_parlay_text(text):
         pick = leg["pick"].strip()
 
         # Remove trailing punctuation
-        pick = re.sub(r"[,;:]+$", "", pick).strip()
+        pick = _TRAILING_PUNCT_RE.sub("", pick).strip()
 
         if pick and len(pick) >= 2:
             leg["pick"] = pick
@@ -203,9 +307,6 @@ def parse_parlay_text(text):
 
 def add_parlay(user_id, user_name, chat_id, legs, stake=None, source="manual"):
     """Add a new parlay."""
-    conn = sqlite3.connect(DATABASE)
-    c = conn.cursor()
-
     total_odds = 1.0
     for leg in legs:
         odds = leg.get("odds", 1.0)
@@ -219,74 +320,67 @@ def add_parlay(user_id, user_name, chat_id, legs, stake=None, source="manual"):
         except:
             pass
 
-    c.execute(
-        """
-        INSERT INTO parlays (user_id, user_name, chat_id, stake, total_odds,
-                            potential_payout, legs, status, created_at, source)
-        VALUES (?, ?, ?, ?, ?, ?, ?, 'open', ?, ?)
-    """,
-        (
-            str(user_id),
-            user_name,
-            str(chat_id),
-            str(stake) if stake else None,
-            f"{total_odds:.2f}",
-            potential_payout,
-            json.dumps(legs),
-            datetime.now().isoformat(),
-            source,
-        ),
-    )
-    parlay_id = c.lastrowid
-    conn.commit()
-    conn.close()
-    return parlay_id
+    with _db_lock:
+        row = get_db().execute(
+            """
+            INSERT INTO parlays (user_id, user_name, chat_id, stake, total_odds,
+                                potential_payout, legs, status, created_at, source)
+            VALUES (?, ?, ?, ?, ?, ?, ?, 'open', ?, ?)
+            RETURNING id
+        """,
+            (
+                str(user_id),
+                user_name,
+                str(chat_id),
+                str(stake) if stake else None,
+                f"{total_odds:.2f}",
+                potential_payout,
+                json.dumps(legs),
+                datetime.now().isoformat(),
+                source,
+            ),
+        ).fetchone()
+    return row[0]
 
 
 def get_user_parlays(user_id, status="open"):
     """Get parlays for a user."""
-    conn = sqlite3.connect(DATABASE)
-    conn.row_factory = sqlite3.Row
-    c = conn.cursor()
-    if status:
-        c.execute(
-            "SELECT * FROM parlays WHERE user_id = ? AND status = ? ORDER BY created_at DESC",
-            (str(user_id), status),
-        )
-    else:
-        c.execute(
-            "SELECT * FROM parlays WHERE user_id = ? ORDER BY created_at DESC",
-            (str(user_id),),
-        )
-    rows = c.fetchall()
-    conn.close()
+    with _db_lock:
+        c = get_db().cursor()
+        if status:
+            c.execute(
+                "SELECT * FROM parlays WHERE user_id = ? AND status = ? ORDER BY created_at DESC",
+                (str(user_id), status),
+            )
+        else:
+            c.execute(
+                "SELECT * FROM parlays WHERE user_id = ? ORDER BY created_at DESC",
+                (str(user_id),),
+            )
+        rows = c.fetchall()
     return [dict(row) for row in rows]
 
 
 def get_parlay(parlay_id):
     """Get a specific parlay."""
-    conn = sqlite3.connect(DATABASE)
-    conn.row_factory = sqlite3.Row
-    c = conn.cursor()
-    c.execute("SELECT * FROM parlays WHERE id = ?", (parlay_id,))
-    row = c.fetchone()
-    conn.close()
+    with _db_lock:
+        c = get_db().cursor()
+        c.execute("SELECT * FROM parlays WHERE id = ?", (parlay_id,))
+        row = c.fetchone()
     return dict(row) if row else None
 
 
 def update_parlay_status(parlay_id, status, result=None):
     """Update parlay status."""
-    conn = sqlite3.connect(DATABASE)
-    c = conn.cursor()
-    c.execute(
-        """
-        UPDATE parlays SET status = ?, result = ?, resolved_at = ?
-        WHERE id = ?
-    """,
-        (status, result, datetime.now().isoformat(), parlay_id),
-    )
-    conn.commit()
-    conn.close()
+    with _db_lock:
+        c = get_db().cursor()
+        c.execute(
+            """
+            UPDATE parlays SET status = ?, result = ?, resolved_at = ?
+            WHERE id = ?
+        """,
+            (status, result, datetime.now().isoformat(), parlay_id),
+        )
 
 
 def format_parlay(parlay, live_data=None):
@@ -475,12 +569,11 @@ def fetch_odds(sport, limit=None):
             if len(competitors) < 2:
                 continue
 
-            home = next(
-                (c for c in competitors if c.get("homeAway") == "home"), competitors[0]
-            )
-            away = next(
-                (c for c in competitors if c.get("homeAway") == "away"), competitors[1]
-            )
+            # ESPN lists the two sides in either order; homeAway says which
+            if competitors[0].get("homeAway") == "away":
+                away, home = competitors[0], competitors[1]
+            else:
+                home, away = competitors[0], competitors[1]
 
             game_info = {
                 "home": home.get("team", {}).get("displayName", ""),
@@ -836,195 +929,252 @@ def compare_darko_to_props(props_data=None):
     }, None
 
 
+# Known team names on betting slips (partial matches OK)
+_SLIP_TEAMS = (
+    # NBA
+    "lakers",
+    "celtics",
+    "warriors",
+    "bulls",
+    "heat",
+    "nets",
+    "knicks",
+    "sixers",
+    "bucks",
+    "suns",
+    "mavericks",
+    "mavs",
+    "clippers",
+    "nuggets",
+    "grizzlies",
+    "cavaliers",
+    "cavs",
+    "thunder",
+    "pelicans",
+    "timberwolves",
+    "wolves",
+    "kings",
+    "hawks",
+    "hornets",
+    "magic",
+    "pacers",
+    "pistons",
+    "raptors",
+    "wizards",
+    "spurs",
+    "jazz",
+    "trail blazers",
+    "blazers",
+    "rockets",
+    # NFL
+    "chiefs",
+    "eagles",
+    "cowboys",
+    "bills",
+    "ravens",
+    "49ers",
+    "niners",
+    "dolphins",
+    "lions",
+    "packers",
+    "bengals",
+    "chargers",
+    "seahawks",
+    "steelers",
+    "rams",
+    "vikings",
+    "jaguars",
+    "jags",
+    "texans",
+    "colts",
+    "broncos",
+    "raiders",
+    "saints",
+    "patriots",
+    "pats",
+    "bears",
+    "falcons",
+    "cardinals",
+    "giants",
+    "jets",
+    "titans",
+    "panthers",
+    "browns",
+    "commanders",
+    "buccaneers",
+    "bucs",
+    # MLB
+    "yankees",
+    "dodgers",
+    "braves",
+    "astros",
+    "mets",
+    "phillies",
+    "padres",
+    "mariners",
+    "blue jays",
+    "orioles",
+    "rays",
+    "twins",
+    "guardians",
+    "rangers",
+    "red sox",
+    "white sox",
+    "cubs",
+    "brewers",
+    "cardinals",
+    "diamondbacks",
+    "dbacks",
+    "giants",
+    "reds",
+    "pirates",
+    "royals",
+    "tigers",
+    "athletics",
+    "angels",
+    "rockies",
+    "marlins",
+    "nationals",
+    # NHL
+    "bruins",
+    "avalanche",
+    "panthers",
+    "oilers",
+    "rangers",
+    "hurricanes",
+    "devils",
+    "maple leafs",
+    "leafs",
+    "lightning",
+    "stars",
+    "jets",
+    "wild",
+    "golden knights",
+    "knights",
+    "flames",
+    "kraken",
+    "penguins",
+    "pens",
+    "capitals",
+    "caps",
+    "canucks",
+    "islanders",
+    "isles",
+    "kings",
+    "blackhawks",
+    "hawks",
+    "blues",
+    "senators",
+    "sens",
+    "sabres",
+    "red wings",
+    "wings",
+    "ducks",
+    "coyotes",
+    "predators",
+    "preds",
+    "sharks",
+    # Soccer
+    "arsenal",
+    "chelsea",
+    "liverpool",
+    "man city",
+    "manchester city",
+    "man united",
+    "manchester united",
+    "tottenham",
+    "spurs",
+    "barcelona",
+    "real madrid",
+    "bayern",
+    "psg",
+    "juventus",
+    "inter",
+    "milan",
+    "dortmund",
+    "ajax",
+    "benfica",
+    "porto",
+)
+
+# Team text is known if it is one of _SLIP_TEAMS (a set lookup, the usual
+# case), contains one (one search of the alternation) or is part of one (a
+# substring of the NUL-joined names)
+_SLIP_TEAM_SET = frozenset(_SLIP_TEAMS)
+_SLIP_TEAM_RE = re.compile("|".join(map(re.escape, _SLIP_TEAMS)))
+_SLIP_TEAMS_JOINED = "\0".join(_SLIP_TEAMS)
+
+
+def _is_slip_team(name):
+    """Whether lowercased team text contains, or is part of, a known team."""
+    return (
+        name in _SLIP_TEAM_SET
+        or name in _SLIP_TEAMS_JOINED
+        or _SLIP_TEAM_RE.search(name) is not None
+    )
+
+
+# Betting slip lines: team + spread/ML/total with optional odds, and bare totals
+_SLIP_BET_RE = re.compile(
+    r"([A-Za-z][A-Za-z\s\.\']+?)\s*+"
+    r"([+-]?\d+\.?\d*|ML|ml|moneyline|over|under|o\d+\.?\d*|u\d+\.?\d*)"
+    r"\s*([+-]\d{2,3})?",
+    re.IGNORECASE,
+)
+_SLIP_TOTAL_RE = re.compile(
+    r"(over|under|o|u)\s*+(\d+\.?\d*)\s*([+-]\d{2,3})?", re.IGNORECASE
+)
+# Either of the above, so a line matching neither costs a single scan
+_SLIP_LINE_RE = re.compile(
+    f"(?P<bet>{_SLIP_BET_RE.pattern})|(?P<total>{_SLIP_TOTAL_RE.pattern})",
+    re.IGNORECASE,
+)
+# OCR lines are cut to this length before matching. A slip leg is far shorter,
+# and the lazy team-name group makes a search superlinear in line length, so
+# the cap bounds the work a garbled line can cost.
+SLIP_LINE_MAX = 200
+
+# Stake amount in a photo caption, e.g. "$20"
+_STAKE_RE = re.compile(r"\$(\d+(?:\.\d{2})?)")
+
+
 def parse_betting_slip_ocr(ocr_lines):
     """Parse OCR text from a betting slip. Focuses on team names + lines."""
     legs = []
-
-    # Known team names (partial matches OK)
-    teams = [
-        # NBA
-        "lakers",
-        "celtics",
-        "warriors",
-        "bulls",
-        "heat",
-        "nets",
-        "knicks",
-        "sixers",
-        "bucks",
-        "suns",
-        "mavericks",
-        "mavs",
-        "clippers",
-        "nuggets",
-        "grizzlies",
-        "cavaliers",
-        "cavs",
-        "thunder",
-        "pelicans",
-        "timberwolves",
-        "wolves",
-        "kings",
-        "hawks",
-        "hornets",
-        "magic",
-        "pacers",
-        "pistons",
-        "raptors",
-        "wizards",
-        "spurs",
-        "jazz",
-        "trail blazers",
-        "blazers",
-        "rockets",
-        # NFL
-        "chiefs",
-        "eagles",
-        "cowboys",
-        "bills",
-        "ravens",
-        "49ers",
-        "niners",
-        "dolphins",
-        "lions",
-        "packers",
-        "bengals",
-        "chargers",
-        "seahawks",
-        "steelers",
-        "rams",
-        "vikings",
-        "jaguars",
-        "jags",
-        "texans",
-        "colts",
-        "broncos",
-        "raiders",
-        "saints",
-        "patriots",
-        "pats",
-        "bears",
-        "falcons",
-        "cardinals",
-        "giants",
-        "jets",
-        "titans",
-        "panthers",
-        "browns",
-        "commanders",
-        "buccaneers",
-        "bucs",
-        # MLB
-        "yankees",
-        "dodgers",
-        "braves",
-        "astros",
-        "mets",
-        "phillies",
-        "padres",
-        "mariners",
-        "blue jays",
-        "orioles",
-        "rays",
-        "twins",
-        "guardians",
-        "rangers",
-        "red sox",
-        "white sox",
-        "cubs",
-        "brewers",
-        "cardinals",
-        "diamondbacks",
-        "dbacks",
-        "giants",
-        "reds",
-        "pirates",
-        "royals",
-        "tigers",
-        "athletics",
-        "angels",
-        "rockies",
-        "marlins",
-        "nationals",
-        # NHL
-        "bruins",
-        "avalanche",
-        "panthers",
-        "oilers",
-        "rangers",
-        "hurricanes",
-        "devils",
-        "maple leafs",
-        "leafs",
-        "lightning",
-        "stars",
-        "jets",
-        "wild",
-        "golden knights",
-        "knights",
-        "flames",
-        "kraken",
-        "penguins",
-        "pens",
-        "capitals",
-        "caps",
-        "canucks",
-        "islanders",
-        "isles",
-        "kings",
-        "blackhawks",
-        "hawks",
-        "blues",
-        "senators",
-        "sens",
-        "sabres",
-        "red wings",
-        "wings",
-        "ducks",
-        "coyotes",
-        "predators",
-        "preds",
-        "sharks",
-        # Soccer
-        "arsenal",
-        "chelsea",
-        "liverpool",
-        "man city",
-        "manchester city",
-        "man united",
-        "manchester united",
-        "tottenham",
-        "spurs",
-        "barcelona",
-        "real madrid",
-        "bayern",
-        "psg",
-        "juventus",
-        "inter",
-        "milan",
-        "dortmund",
-        "ajax",
-        "benfica",
-        "porto",
-    ]
-
-    # Combine all OCR text to search through
-    full_text = " ".join(ocr_lines)
+    # Lowercased picks so far, NUL-separated: a new leg is a duplicate if its
+    # key is part of any earlier pick
+    seen_picks = ""
 
     for line in ocr_lines:
-        line = line.strip()
+        line = line.strip()[:SLIP_LINE_MAX]
         if len(line) < 3:
             continue
 
         line_lower = line.lower()
 
+        # Every slip leg has a digit or one of these words, so lines with
+        # neither can skip the regexes
+        if not (
+            "over" in line_lower
+            or "under" in line_lower
+            or "ml" in line_lower
+            or "money" in line_lower
+            or any(map(str.isdecimal, line_lower))
+        ):
+            continue
+
         # Look for team name + line pattern (e.g., "Lakers +3", "Chiefs -7.5", "Celtics ML")
         # Pattern: Team name followed by spread/ML/over/under
-        bet_pattern = re.search(
-            r"([A-Za-z][A-Za-z\s\.\']+?)\s*([+-]?\d+\.?\d*|ML|ml|moneyline|over|under|o\d+\.?\d*|u\d+\.?\d*)\s*([+-]\d{2,3})?",
-            line,
-            re.IGNORECASE,
-        )
+        # Neither pattern matches before the leftmost match of either, so
+        # the individual searches can start there
+        either = _SLIP_LINE_RE.search(line)
+        if not either:
+            continue
+        start = either.start()
+        if either.lastgroup == "bet":
+            bet_pattern = _SLIP_BET_RE.match(line, start)
+        else:
+            bet_pattern = _SLIP_BET_RE.search(line, start + 1)
 
         if bet_pattern:
             potential_team = bet_pattern.group(1).strip().lower()
@@ -1033,10 +1183,8 @@ def parse_betting_slip_ocr(ocr_lines):
 
             # Check if this matches a known team
             team_match = None
-            for team in teams:
-                if team in potential_team or potential_team in team:
-                    team_match = potential_team.title()
-                    break
+            if _is_slip_team(potential_team):
+                team_match = potential_team.title()
 
             if team_match:
                 # Build the pick string
@@ -1044,14 +1192,13 @@ def parse_betting_slip_ocr(ocr_lines):
                 odds_val = parse_odds(odds) if odds else 1.0
 
                 # Avoid duplicates
-                if not any(team_match.lower() in leg["pick"].lower() for leg in legs):
+                if team_match.lower() not in seen_picks:
                     legs.append({"pick": pick, "odds": odds_val})
+                    seen_picks += "\0" + pick.lower()
                 continue
 
         # Also check for over/under totals (e.g., "Over 220.5", "Under 45")
-        total_pattern = re.search(
-            r"(over|under|o|u)\s*(\d+\.?\d*)\s*([+-]\d{2,3})?", line, re.IGNORECASE
-        )
+        total_pattern = _SLIP_TOTAL_RE.search(line, start)
 
         if total_pattern:
             ou_type = total_pattern.group(1).upper()
@@ -1064,8 +1211,10 @@ def parse_betting_slip_ocr(ocr_lines):
             odds_val = parse_odds(odds) if odds else 1.0
 
             # Avoid duplicates
-            if not any(pick.lower() in leg["pick"].lower() for leg in legs):
+            pick_lower = pick.lower()
+            if pick_lower not in seen_picks:
                 legs.append({"pick": pick, "odds": odds_val})
+                seen_picks += "\0" + pick_lower
 
     return legs
 
@@ -1285,11 +1434,8 @@ async def parlay_delete(update: Update, context: ContextTypes.DEFAULT_TYPE):
         return
 
     # Delete from database
-    conn = sqlite3.connect(DATABASE)
-    c = conn.cursor()
-    c.execute("DELETE FROM parlays WHERE id = ?", (parlay_id,))
-    conn.commit()
-    conn.close()
+    with _db_lock:
+        get_db().execute("DELETE FROM parlays WHERE id = ?", (parlay_id,))
 
     await update.message.reply_text(f"Parlay #{parlay_id} deleted.")
 
@@ -1445,14 +1591,16 @@ async def injury_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await update.message.reply_text("Couldn't fetch injury report.")
         return
 
-    # Group by status
-    out = [i for i in injuries if "out" in i["status"].lower()]
-    doubtful = [i for i in injuries if "doubtful" in i["status"].lower()]
-    questionable = [
-        i
-        for i in injuries
-        if "questionable" in i["status"].lower() or "day-to-day" in i["status"].lower()
-    ]
+    # Group by status (a report can fall in more than one group)
+    out, doubtful, questionable = [], [], []
+    for i in injuries:
+        status = i["status"].lower()
+        if "out" in status:
+            out.append(i)
+        if "doubtful" in status:
+            doubtful.append(i)
+        if "questionable" in status or "day-to-day" in status:
+            questionable.append(i)
 
     lines = ["*NBA Injury Report*\n"]
 
@@ -1610,11 +1758,18 @@ async def handle_photo(update: Update, context: ContextTypes.DEFAULT_TYPE):
         # Download the image
         image_bytes = await file.download_as_bytearray()
 
-        # Run OCR
-        reader = get_ocr_reader()
-        results = reader.readtext(bytes(image_bytes))
+        # Run OCR in the worker process
+        pool = get_ocr_pool()
+        try:
+            results = await asyncio.get_running_loop().run_in_executor(
+                pool, ocr_readtext, image_bytes
+            )
+        except BrokenProcessPool:
+            # The worker died; start a fresh one for the next photo
+            reset_ocr_pool(pool)
+            raise
 
-        ocr_lines = [text for (_, text, conf) in results if conf > 0.3]
+        ocr_lines = [text for text, conf in results if conf > 0.3]
 
         if not ocr_lines:
             await update.message.reply_text(
@@ -1637,7 +1792,7 @@ async def handle_photo(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
         # Look for stake in caption (optional)
         caption = update.message.caption or ""
-        stake_match = re.search(r"\$(\d+(?:\.\d{2})?)", caption)
+        stake_match = _STAKE_RE.search(caption)
         stake = stake_match.group(1) if stake_match else None
 
         # Create parlay
@@ -1676,6 +1831,14 @@ def main():
     init_db()
     logger.info("Database initialized")
 
+    # Start the OCR worker now, so its model loads while the bot starts up
+    # instead of on the first screenshot. A failed load is only logged; the
+    # next screenshot retries it.
+    ocr_pool = get_ocr_pool()
+    ocr_pool.submit(warm_ocr_reader).add_done_callback(
+        lambda future: _log_ocr_warmup(ocr_pool, future)
+    )
+
     # Create application
     app = Application.builder().token(token).build()
 